@@ -0,0 +1,50 @@
+"""add full-text search vectors to doctors and medicines
+
+Revision ID: 3f9c2b7a1d4e
+Revises: 1c7e5a9f2b30
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2b7a1d4e'
+down_revision: Union[str, None] = '1c7e5a9f2b30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+DOCTORS_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(speciality, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(bio, '')), 'B')"
+)
+MEDICINES_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(manufacturer, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    # Stored generated columns are recomputed by Postgres on every write, so no trigger is needed
+    op.add_column('doctors', sa.Column('search_vector', postgresql.TSVECTOR(),
+                                       sa.Computed(DOCTORS_VECTOR, persisted=True), nullable=True))
+    op.create_index('ix_doctors_search_vector', 'doctors', ['search_vector'], unique=False,
+                    postgresql_using='gin')
+    op.add_column('medicines', sa.Column('search_vector', postgresql.TSVECTOR(),
+                                         sa.Computed(MEDICINES_VECTOR, persisted=True), nullable=True))
+    op.create_index('ix_medicines_search_vector', 'medicines', ['search_vector'], unique=False,
+                    postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_medicines_search_vector', table_name='medicines', postgresql_using='gin')
+    op.drop_column('medicines', 'search_vector')
+    op.drop_index('ix_doctors_search_vector', table_name='doctors', postgresql_using='gin')
+    op.drop_column('doctors', 'search_vector')
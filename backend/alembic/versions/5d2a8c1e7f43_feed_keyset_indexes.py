@@ -0,0 +1,40 @@
+"""make feed timestamps NOT NULL and index the feed keyset cursors
+
+Revision ID: 5d2a8c1e7f43
+Revises: 8b1e4d2c6a90
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2a8c1e7f43'
+down_revision: Union[str, None] = '8b1e4d2c6a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # (timestamp, id) is the feed cursor; undated rows get the epoch so they sort last, newest first
+    for table in ('posts', 'comments'):
+        op.execute(f"UPDATE {table} SET timestamp = 'epoch' WHERE timestamp IS NULL")
+        op.alter_column(table, 'timestamp', existing_type=sa.DateTime(), nullable=False)
+
+    # Built without blocking feed writes; CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_posts_timestamp_id', 'posts', ['timestamp', 'id'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_comments_post_id_timestamp_id', 'comments', ['post_id', 'timestamp', 'id'],
+                        unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_comments_post_id_timestamp_id', table_name='comments', postgresql_concurrently=True)
+        op.drop_index('ix_posts_timestamp_id', table_name='posts', postgresql_concurrently=True)
+    for table in ('posts', 'comments'):
+        op.alter_column(table, 'timestamp', existing_type=sa.DateTime(), nullable=True)
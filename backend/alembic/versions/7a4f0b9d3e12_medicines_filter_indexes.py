@@ -0,0 +1,39 @@
+"""index the medicines filter and sort columns
+
+Revision ID: 7a4f0b9d3e12
+Revises: 5d2a8c1e7f43
+Create Date: 2026-10-18 13:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4f0b9d3e12'
+down_revision: Union[str, None] = '5d2a8c1e7f43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_medicines_category', 'medicines', ['category'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_medicines_price', 'medicines', ['price'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_medicines_rating', 'medicines', ['rating'], unique=False,
+                        postgresql_concurrently=True)
+        # lower(name) LIKE 'abc%' needs pattern ops to use a B-tree
+        op.create_index('ix_medicines_name_lower', 'medicines', [sa.text('lower(name) text_pattern_ops')],
+                        unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_medicines_name_lower', table_name='medicines', postgresql_concurrently=True)
+        op.drop_index('ix_medicines_rating', table_name='medicines', postgresql_concurrently=True)
+        op.drop_index('ix_medicines_price', table_name='medicines', postgresql_concurrently=True)
+        op.drop_index('ix_medicines_category', table_name='medicines', postgresql_concurrently=True)
@@ -0,0 +1,27 @@
+"""drop the unique index on users.password
+
+Revision ID: 8b1e4d2c6a90
+Revises: 3f9c2b7a1d4e
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b1e4d2c6a90'
+down_revision: Union[str, None] = '3f9c2b7a1d4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Salted hashes are never looked up and cannot collide in practice; the unique B-tree
+    # only cost an index write and a uniqueness check on every signup and password rehash
+    op.drop_index('ix_users_password', table_name='users')
+
+
+def downgrade() -> None:
+    op.create_index('ix_users_password', 'users', ['password'], unique=True)
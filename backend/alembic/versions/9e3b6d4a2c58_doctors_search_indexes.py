@@ -0,0 +1,50 @@
+"""index the doctor search filters
+
+Revision ID: 9e3b6d4a2c58
+Revises: 7a4f0b9d3e12
+Create Date: 2026-10-18 13:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e3b6d4a2c58'
+down_revision: Union[str, None] = '7a4f0b9d3e12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # gin_trgm_ops for the location substring filter; needs CREATE privilege on the database
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        # GIN indexes answer the array containment (@>) filters
+        for column in ('languages', 'insurance_accepted', 'specializations'):
+            op.create_index(f'ix_doctors_{column}', 'doctors', [column], unique=False,
+                            postgresql_using='gin', postgresql_concurrently=True)
+        op.create_index('ix_doctors_location_trgm', 'doctors', ['location'], unique=False,
+                        postgresql_using='gin', postgresql_ops={'location': 'gin_trgm_ops'},
+                        postgresql_concurrently=True)
+        op.create_index('ix_doctors_speciality_lower', 'doctors', [sa.text('lower(speciality)')], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_doctors_rating', 'doctors', ['rating'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_doctors_consultation_fee', 'doctors', ['consultation_fee'], unique=False,
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_doctors_consultation_fee', table_name='doctors', postgresql_concurrently=True)
+        op.drop_index('ix_doctors_rating', table_name='doctors', postgresql_concurrently=True)
+        op.drop_index('ix_doctors_speciality_lower', table_name='doctors', postgresql_concurrently=True)
+        op.drop_index('ix_doctors_location_trgm', table_name='doctors', postgresql_using='gin',
+                      postgresql_concurrently=True)
+        for column in ('specializations', 'insurance_accepted', 'languages'):
+            op.drop_index(f'ix_doctors_{column}', table_name='doctors', postgresql_using='gin',
+                          postgresql_concurrently=True)
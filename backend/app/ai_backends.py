@@ -0,0 +1,184 @@
+"""Inference backends for the sentiment model behind /ai/chat.
+
+Every backend exposes `classify(texts)`, returning one list of
+{"label", "score"} dicts per input text, plus `start()`/`close()` hooks run
+from the app lifespan.
+
+RemoteBackend calls the Hugging Face Inference API. LocalBackend runs an ONNX
+export of the model on the CPU in a process pool, with no network round-trip.
+It needs the optional onnxruntime, tokenizers and numpy packages and a model
+directory holding model.onnx, tokenizer.json and config.json. A quantized
+directory can be produced with:
+
+    optimum-cli export onnx --model cardiffnlp/twitter-roberta-base-sentiment-latest model/
+    python -c "from onnxruntime.quantization import quantize_dynamic, QuantType; \
+        quantize_dynamic('model/model.onnx', 'model/model.quant.onnx', weight_type=QuantType.QInt8)"
+
+then set AI_LOCAL_MODEL_FILE=model.quant.onnx.
+
+Every uvicorn worker starts its own LocalBackend pool, alongside its password
+hashing pool, so a host runs uvicorn workers x AI_LOCAL_WORKERS inference
+processes. Keep that product within the cores set aside for inference.
+"""
+import asyncio
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+import httpx
+from fastapi import HTTPException
+
+
+class RemoteBackend:
+    def __init__(self, api_url: str, token: str, timeout: float, connect_timeout: float,
+                 max_connections: int, max_concurrency: int):
+        self.model_id = api_url
+        self.api_url = api_url
+        self._token = token
+        self._timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self._max_connections = max_connections
+        self._max_concurrency = max_concurrency
+        self.http_client: httpx.AsyncClient | None = None
+        self.inference_slots: asyncio.Semaphore | None = None
+
+    async def start(self):
+        self.http_client = httpx.AsyncClient(
+            headers={
+                "Authorization": f"Bearer {self._token}",
+                "Content-Type": "application/json"
+            },
+            timeout=self._timeout,
+            limits=httpx.Limits(
+                max_connections=self._max_connections,
+                max_keepalive_connections=self._max_connections
+            ),
+        )
+        self.inference_slots = asyncio.Semaphore(self._max_concurrency)
+
+    async def close(self):
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+
+    async def classify(self, texts: List[str]) -> list:
+        """POST `texts` as one list-valued `inputs` call and return the decoded JSON list"""
+        if self.http_client is None:
+            raise HTTPException(status_code=503, detail="AI client is not initialised")
+
+        # Make request to Hugging Face API with timeout
+        try:
+            async with self.inference_slots:
+                response = await self.http_client.post(self.api_url, json={"inputs": texts})
+        except httpx.TimeoutException:
+            raise HTTPException(status_code=504, detail="Request to Hugging Face API timed out")
+        except httpx.TransportError:
+            raise HTTPException(status_code=503, detail="Could not connect to Hugging Face API")
+
+        # Handle API response status codes
+        if response.status_code == 401:
+            raise HTTPException(status_code=401, detail="Invalid API token")
+        elif response.status_code == 429:
+            raise HTTPException(status_code=429, detail="Too many requests to Hugging Face API")
+        elif response.status_code != 200:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Error from Hugging Face API: {response.text}"
+            )
+
+        # Parse and validate response
+        try:
+            response_data = response.json()
+        except ValueError:
+            raise HTTPException(status_code=500, detail="Invalid JSON response from API")
+
+        if not isinstance(response_data, list):
+            raise HTTPException(status_code=500, detail="Unexpected response format from API")
+        return response_data
+
+
+# Per-process model state for LocalBackend workers, filled in by _init_worker
+_session = None
+_tokenizer = None
+_labels = None
+
+
+def _init_worker(model_dir: str, model_file: str, max_length: int):
+    global _session, _tokenizer, _labels
+    import onnxruntime
+    from tokenizers import Tokenizer
+
+    options = onnxruntime.SessionOptions()
+    # Parallelism comes from the process pool; one thread per worker avoids oversubscription
+    options.intra_op_num_threads = 1
+    _session = onnxruntime.InferenceSession(
+        os.path.join(model_dir, model_file), options, providers=["CPUExecutionProvider"]
+    )
+    _tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+    _tokenizer.enable_truncation(max_length)
+    _tokenizer.enable_padding()
+    with open(os.path.join(model_dir, "config.json")) as f:
+        id2label = json.load(f)["id2label"]
+    _labels = [id2label[str(i)] for i in range(len(id2label))]
+
+
+def _classify(texts: List[str]) -> list:
+    import numpy as np
+
+    encodings = _tokenizer.encode_batch(texts)
+    feed = {
+        "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+        "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+    }
+    expected = {i.name for i in _session.get_inputs()}
+    logits = _session.run(None, {name: value for name, value in feed.items() if name in expected})[0]
+
+    exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+    scores = exp / exp.sum(axis=1, keepdims=True)
+    return [
+        sorted(
+            ({"label": label, "score": float(score)} for label, score in zip(_labels, row)),
+            key=lambda item: item["score"],
+            reverse=True,
+        )
+        for row in scores
+    ]
+
+
+class LocalBackend:
+    def __init__(self, model_dir: str, model_file: str = "model.onnx", workers: int = 2,
+                 max_length: int = 128):
+        self.model_id = os.path.join(model_dir, model_file)
+        self._init_args = (model_dir, model_file, max_length)
+        self.workers = max(1, workers)
+        self._pool: ProcessPoolExecutor | None = None
+
+    async def start(self):
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker, initargs=self._init_args
+        )
+        # Spawn every worker and load the model now rather than on the first chat message
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self._pool, _classify, ["warm up"]) for _ in range(self.workers)
+        ))
+
+    async def close(self):
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            # Joining the worker processes blocks, so wait for it off the event loop
+            await asyncio.to_thread(pool.shutdown, cancel_futures=True)
+
+    async def classify(self, texts: List[str]) -> list:
+        if self._pool is None:
+            raise HTTPException(status_code=503, detail="AI model is not loaded")
+
+        # Spread one batch over the workers, keeping the input order
+        loop = asyncio.get_running_loop()
+        chunk = math.ceil(len(texts) / self.workers)
+        parts = await asyncio.gather(*(
+            loop.run_in_executor(self._pool, _classify, texts[i:i + chunk])
+            for i in range(0, len(texts), chunk)
+        ))
+        return [result for part in parts for result in part]
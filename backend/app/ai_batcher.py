@@ -0,0 +1,85 @@
+"""Request coalescing for the sentiment model.
+
+Concurrent /ai/chat calls are collected for at most `max_delay` seconds or
+`max_batch_size` messages, sent upstream as one list-valued `inputs` call,
+and the per-item results are handed back to the waiting requests.
+"""
+import asyncio
+from typing import Awaitable, Callable, List
+
+from fastapi import HTTPException
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        infer_batch: Callable[[List[str]], Awaitable[list]],
+        max_batch_size: int = 32,
+        max_delay: float = 0.01,
+    ):
+        self._infer_batch = infer_batch
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+        self.upstream_inputs = 0
+
+    async def submit(self, text: str):
+        """Queue `text` for the next batch and wait for its own result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            # Keep a reference so the task is not garbage collected mid-flight
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[str, asyncio.Future]]):
+        # Requests cancelled while waiting (client went away) are not sent upstream
+        live = [(text, future) for text, future in batch if not future.done()]
+        if not live:
+            return
+
+        # Identical messages in one window are inferred once
+        unique_texts = list(dict.fromkeys(text for text, _ in live))
+        self.batches += 1
+        self.items += len(live)
+        self.upstream_inputs += len(unique_texts)
+
+        try:
+            results = await self._infer_batch(unique_texts)
+            if len(results) != len(unique_texts):
+                raise HTTPException(status_code=500, detail="Unexpected response format from API")
+        except Exception as e:
+            for _, future in live:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_text = dict(zip(unique_texts, results))
+        for text, future in live:
+            if not future.done():
+                future.set_result(by_text[text])
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "upstream_inputs": self.upstream_inputs,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+        }
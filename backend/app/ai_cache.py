@@ -0,0 +1,112 @@
+"""Response cache for /ai/chat.
+
+Replies are keyed by a SHA-256 of the model URL and the normalised message,
+so the raw text is never stored as a key. The default backend is an
+in-process LRU; setting AI_CACHE_REDIS_URL shares entries between workers
+through any Redis-compatible server (requires the optional `redis` package).
+"""
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(model: str, message: str) -> str:
+    return hashlib.sha256(f"{model}\n{message.strip()}".encode()).hexdigest()
+
+
+class LRUCache:
+    """Size-bounded LRU with a per-entry TTL"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisCache:
+    """Shared cache; Redis enforces the TTL and its maxmemory policy the size bound"""
+
+    def __init__(self, url: str, ttl: float, prefix: str = "ai:chat:"):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url, decode_responses=True)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._redis.get(self.prefix + key)
+
+    async def set(self, key: str, value: str):
+        await self._redis.set(self.prefix + key, value, ex=int(self.ttl))
+
+    async def close(self):
+        await self._redis.aclose()
+
+
+class ResponseCache:
+    """Counts hits and misses; backend failures degrade to a miss instead of failing the request"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            logger.error(f"AI cache lookup failed: {e}")
+            self.errors += 1
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: str):
+        try:
+            await self.backend.set(key, value)
+        except Exception as e:
+            logger.error(f"AI cache store failed: {e}")
+            self.errors += 1
+
+    async def close(self):
+        if hasattr(self.backend, "close"):
+            await self.backend.close()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.backend) if hasattr(self.backend, "__len__") else None,
+        }
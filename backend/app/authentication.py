@@ -1,26 +1,40 @@
 from typing import Annotated
 from fastapi import APIRouter, Depends
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from .schema import Token , User
-from .database import get_db
-from .oauth2 import create_token 
-from .crud import login,signup
+from .schema import RefreshRequest , Token , User
+from .database import get_async_db
+from .oauth2 import create_token , create_refresh_token
+from .crud import login,signup,refresh,logout
 
 
 router = APIRouter()
 
 @router.post("/login")
-def get_user( credentials : Annotated[OAuth2PasswordRequestForm , Depends()], db : Session = Depends(get_db)) -> Token:
-    data = login( db = db , username= credentials.username , password= credentials.password)
+async def get_user( credentials : Annotated[OAuth2PasswordRequestForm , Depends()], db : AsyncSession = Depends(get_async_db)) -> Token:
+    data = await login( db = db , username= credentials.username , password= credentials.password)
     if data:
         tok = create_token(data={"u_id" : data})
-        return Token(access_token = tok , token_type = "bearer")
+        return Token(access_token = tok , token_type = "bearer" , refresh_token = create_refresh_token(data))
     return data
 
 
 @router.post("/signup")
-def new_user( user : User , db : Session = Depends(get_db)):
-    msg = signup(db = db , new_user = user )
-    return msg
\ No newline at end of file
+async def new_user( user : User , db : AsyncSession = Depends(get_async_db)):
+    msg = await signup(db = db , new_user = user )
+    return msg
+
+
+@router.post("/refresh")
+async def refresh_token( body : RefreshRequest , db : AsyncSession = Depends(get_async_db)) -> Token:
+    # Rotation: the presented refresh token is revoked and a new one issued with the access token
+    u_id , family = await refresh(db = db , refresh_token = body.refresh_token)
+    tok = create_token(data={"u_id" : u_id})
+    return Token(access_token = tok , token_type = "bearer" , refresh_token = create_refresh_token(u_id , family = family))
+
+
+@router.post("/logout")
+async def end_session( body : RefreshRequest , db : AsyncSession = Depends(get_async_db)):
+    msg = await logout(db = db , refresh_token = body.refresh_token)
+    return msg
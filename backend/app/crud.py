@@ -1,29 +1,55 @@
+from datetime import datetime
 from typing import List
 from fastapi import HTTPException , status
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import EmailStr
 
 from app.schema import User
-from .models import users
-from .oauth2 import hashpassword , verify
+from .models import users , RevokedToken
+from .oauth2 import hashpassword , verify_and_update , decode_refresh_token , CREDENTIALS_EXCEPTION , REFRESH_EXPIRATION
+from .revocation import revocations
 
 
 
 
 
-def login( db : Session , username : str , password : str ):
-    data = (db.query(users.u_id,users.email,users.password).filter(users.email == username).first())
+async def login( db : AsyncSession , username : str , password : str ):
+    data = (await db.execute(select(users.u_id,users.email,users.password).where(users.email == username))).first()
     if data is None :
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,detail=f"Invalid Credentials")
-    if (verify(password,data.password)):
+    valid, new_hash = await verify_and_update(password,data.password)
+    if valid:
+        if new_hash:
+            # Stored hash predates the current hashing policy; replace it while we have the password
+            await db.execute(update(users).where(users.u_id == data.u_id).values(password=new_hash))
+            await db.commit()
         return (data.u_id)
     else:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,detail=f"Invalid Credentials")
     
-def signup( db : Session , new_user : User):
-    new_user.password = hashpassword(new_user.password)
+async def signup( db : AsyncSession , new_user : User):
+    new_user.password = await hashpassword(new_user.password)
     data = users(**(dict(new_user)))
     db.add(data)
-    db.commit()
-    db.refresh(data)
-    return "Successfully Registered New User"
\ No newline at end of file
+    await db.commit()
+    return "Successfully Registered New User"
+
+
+
+async def refresh( db : AsyncSession , refresh_token : str ):
+    """Use up a refresh token; returns the user id and token family to issue the next pair for"""
+    payload = decode_refresh_token(refresh_token)
+    family_key = f"fam:{payload['fam']}"
+    if await db.get(RevokedToken , family_key) is not None:
+        raise CREDENTIALS_EXCEPTION.with_traceback(None)
+    if not await revocations.revoke(db , payload["jti"] , datetime.utcfromtimestamp(payload["exp"])):
+        # Already used once, so a copy is being replayed: end every session rotated from that login
+        await revocations.revoke(db , family_key , datetime.utcnow() + REFRESH_EXPIRATION)
+        raise CREDENTIALS_EXCEPTION.with_traceback(None)
+    return payload["u_id"] , payload["fam"]
+
+async def logout( db : AsyncSession , refresh_token : str ):
+    payload = decode_refresh_token(refresh_token)
+    await revocations.revoke(db , f"fam:{payload['fam']}" , datetime.utcnow() + REFRESH_EXPIRATION)
+    return "Successfully Logged Out"
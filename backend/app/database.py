@@ -1,22 +1,114 @@
-from sqlalchemy import create_engine
+import threading
+import time
+
+from sqlalchemy import create_engine, exc
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from .schema import Settings
 
 setting = Settings()
 
 SQLALCHEMY_DATABASE_URL = f"postgresql://{setting.database_username}:{setting.database_password}@{setting.database_hostname}/{setting.database_name}"
+ASYNC_SQLALCHEMY_DATABASE_URL = f"postgresql+asyncpg://{setting.database_username}:{setting.database_password}@{setting.database_hostname}/{setting.database_name}"
+
+
+class PoolWaitStats:
+    """Time spent waiting for a connection to be handed out by the pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "total_wait_seconds": self.total_wait,
+                "avg_wait_seconds": self.total_wait / self.checkouts if self.checkouts else 0.0,
+                "max_wait_seconds": self.max_wait,
+            }
+
+
+class _TimedPoolMixin:
+    # _do_get is where QueuePool blocks until a connection is free (or pool_timeout expires)
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.wait_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - start)
+        return connection
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
 
-engine = create_engine ( SQLALCHEMY_DATABASE_URL)
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+POOL_OPTIONS = dict(
+    pool_size=setting.db_pool_size,
+    max_overflow=setting.db_max_overflow,
+    pool_timeout=setting.db_pool_timeout,
+    pool_recycle=setting.db_pool_recycle,
+    pool_pre_ping=setting.db_pool_pre_ping,
+)
+
+# Sync engine for `def` handlers and scripts such as init_data
+engine = create_engine ( SQLALCHEMY_DATABASE_URL, poolclass=TimedQueuePool, **POOL_OPTIONS)
 
 SessionLocal = sessionmaker(autoflush=False , autocommit=False , bind=engine)
 
+# Async engine for `async def` handlers, so queries never block the event loop
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, poolclass=TimedAsyncQueuePool, **POOL_OPTIONS)
+
+# expire_on_commit=False: attributes stay readable after commit without an implicit (blocking) refresh
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
+
+def pool_status(pool) -> dict:
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # overflow() is negative while the pool has not yet opened pool_size connections
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": setting.db_max_overflow,
+        "wait": pool.wait_stats.snapshot(),
+    }
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,56 +1,150 @@
-from fastapi import APIRouter
-from typing import List
-from app.models import Post, Author, Comment
-from app.schema import PostSchema
-from app.database import get_db
-from sqlalchemy.orm import Session
+import base64
+import binascii
+from datetime import datetime
+
+from fastapi import APIRouter, HTTPException, Query, Response
+from typing import List, Optional
+from app.models import Post, Comment
+from app.schema import PostSchema, CommentSchema
+from app.database import get_async_db
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from fastapi import Depends
 
 
 router = APIRouter()
 
+# Name of the response header carrying the cursor of the next page; absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(timestamp: datetime, id: str) -> str:
+    raw = f"{timestamp.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        timestamp, id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(timestamp), id
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _author_dict(author):
+    return {
+        "id": author.id,
+        "name": author.name,
+        "avatar": author.avatar,
+        "role": author.role,
+        "verified": author.verified
+    }
+
+
+def _comment_dict(comment):
+    return {
+        "id": comment.id,
+        "author": _author_dict(comment.author),
+        "content": comment.content,
+        "timestamp": comment.timestamp.isoformat(),
+        "likes": comment.likes
+    }
+
+
+def _post_dict(post, comments):
+    return {
+        "id": post.id,
+        "author": _author_dict(post.author),
+        "content": post.content,
+        "timestamp": post.timestamp.isoformat(),
+        "likes": post.likes,
+        "liked": post.liked,
+        "comments": [_comment_dict(comment) for comment in comments],
+        "shares": post.shares,
+        "tags": post.tags.split(','),  # Assuming tags are stored as a comma-separated string
+        "read_time": post.read_time,
+        "trending": post.trending,
+        "image": post.image,
+        "completed_time": post.completed_time.isoformat() if post.completed_time else None
+    }
+
+
+async def _newest_comments(db: AsyncSession, post_ids: list, per_post: int) -> dict:
+    """Return the `per_post` newest comments of each post, grouped by post_id"""
+    if not post_ids or per_post == 0:
+        return {}
+
+    ranked = (
+        select(
+            Comment.id,
+            func.row_number().over(
+                partition_by=Comment.post_id,
+                order_by=(Comment.timestamp.desc(), Comment.id.desc())
+            ).label("rank")
+        )
+        .where(Comment.post_id.in_(post_ids))
+        .subquery()
+    )
+    comments = (await db.scalars(
+        select(Comment)
+        .join(ranked, ranked.c.id == Comment.id)
+        .where(ranked.c.rank <= per_post)
+        .options(selectinload(Comment.author))
+        .order_by(Comment.timestamp.desc(), Comment.id.desc())
+    )).all()
+
+    comments_by_post = {}
+    for comment in comments:
+        comments_by_post.setdefault(comment.post_id, []).append(comment)
+    return comments_by_post
+
+
 @router.get("/", response_model=List[PostSchema])
-async def get_data(db: Session = Depends(get_db)):
-    posts = db.query(Post).all()  
-    authors = db.query(Author).all()  
-    comments = db.query(Comment).all() 
-
-    # Combine posts, authors, and comments into a single response
-    result = []
-    for post in posts:
-        author = next((a for a in authors if a.id == post.author_id), None)
-        post_comments = [comment for comment in comments if comment.post_id == post.id]  # Get comments for the post
-        result.append({
-            "id": post.id,
-            "author": {
-                "id": author.id,
-                "name": author.name,
-                "avatar": author.avatar,
-                "role": author.role,
-                "verified": author.verified
-            },
-            "content": post.content,
-            "timestamp": post.timestamp.isoformat(),
-            "likes": post.likes,
-            "liked": post.liked,
-            "comments": [{
-                "id": comment.id,
-                "author": {
-                    "id": comment.author.id,
-                    "name": comment.author.name,
-                    "avatar": comment.author.avatar,
-                    "role": comment.author.role,
-                    "verified": comment.author.verified
-                },
-                "content": comment.content,
-                "timestamp": comment.timestamp.isoformat(),
-                "likes": comment.likes
-            } for comment in post_comments],  # Use fetched comments
-            "shares": post.shares,
-            "tags": post.tags.split(','),  # Assuming tags are stored as a comma-separated string
-            "read_time": post.read_time,
-            "trending": post.trending,
-            "image": post.image,
-            "completed_time": post.completed_time.isoformat() if post.completed_time else None
-        })
-    return result
+async def get_data(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    comments_limit: int = Query(3, ge=0, le=50),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Keyset pagination, newest first: the cursor is the (timestamp, id) of the last
+    # post of the previous page, so every page is an index range scan.
+    query = select(Post).options(selectinload(Post.author))
+    if cursor:
+        query = query.where(tuple_(Post.timestamp, Post.id) < decode_cursor(cursor))
+    posts = (await db.scalars(query.order_by(Post.timestamp.desc(), Post.id.desc()).limit(limit + 1))).all()
+
+    if len(posts) > limit:
+        posts = posts[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(posts[-1].timestamp, posts[-1].id)
+
+    comments_by_post = await _newest_comments(db, [post.id for post in posts], comments_limit)
+    return [_post_dict(post, comments_by_post.get(post.id, [])) for post in posts]
+
+
+@router.get("/{post_id}/comments", response_model=List[CommentSchema])
+async def get_comments(
+    post_id: str,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if await db.get(Post, post_id) is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    query = (
+        select(Comment)
+        .options(selectinload(Comment.author))
+        .where(Comment.post_id == post_id)
+    )
+    if cursor:
+        query = query.where(tuple_(Comment.timestamp, Comment.id) < decode_cursor(cursor))
+    comments = (await db.scalars(query.order_by(Comment.timestamp.desc(), Comment.id.desc()).limit(limit + 1))).all()
+
+    if len(comments) > limit:
+        comments = comments[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(comments[-1].timestamp, comments[-1].id)
+
+    return [_comment_dict(comment) for comment in comments]
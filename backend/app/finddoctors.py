@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm.state import InstanceState
 
 from app.schema import Doctor
 from .database import get_db  # Assuming you have a get_db function to get the database session
@@ -9,12 +10,62 @@ from .models import DoctorModel  # Importing the DoctorModel
 
 router = APIRouter()
 
+# Column keys are resolved once instead of walking __table__.columns for every row;
+# generated columns such as search_vector are internal and not part of the payload
+DOCTOR_COLUMNS = [c.key for c in DoctorModel.__table__.columns if c.computed is None]
+
+# Every sort ends on the primary key so limit/offset pages are stable
+SORT_ORDERS = {
+    "rating": (DoctorModel.rating.desc(), DoctorModel.id.asc()),
+    "fee_asc": (DoctorModel.consultation_fee.asc(), DoctorModel.id.asc()),
+    "fee_desc": (DoctorModel.consultation_fee.desc(), DoctorModel.id.asc()),
+    "reviews": (DoctorModel.reviews.desc(), DoctorModel.id.asc()),
+}
+
+
+def doctor_to_dict(doctor: DoctorModel) -> dict:
+    return {key: getattr(doctor, key) for key in DOCTOR_COLUMNS}
+
+
 @router.get("/", response_model=list[Doctor])
 def get_doctors(db: Session = Depends(get_db)):
     doctors = db.query(DoctorModel).all()
-    doctor_list = []
-    for doctor in doctors:
-        doctor_dict = {c.key: getattr(doctor, c.key) 
-                      for c in doctor.__table__.columns}
-        doctor_list.append(doctor_dict)
-    return JSONResponse(content=doctor_list)
\ No newline at end of file
+    return JSONResponse(content=[doctor_to_dict(doctor) for doctor in doctors])
+
+
+@router.get("/search", response_model=list[Doctor])
+def search_doctors(
+    speciality: Optional[str] = None,
+    location: Optional[str] = Query(None, min_length=1),
+    languages: Optional[List[str]] = Query(None),
+    insurance_accepted: Optional[List[str]] = Query(None),
+    specializations: Optional[List[str]] = Query(None),
+    min_fee: Optional[float] = Query(None, ge=0),
+    max_fee: Optional[float] = Query(None, ge=0),
+    min_rating: Optional[float] = Query(None, ge=0, le=5),
+    sort: Literal["rating", "fee_asc", "fee_desc", "reviews"] = "rating",
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    query = db.query(DoctorModel)
+    if speciality:
+        query = query.filter(func.lower(DoctorModel.speciality) == speciality.lower())
+    if location:
+        query = query.filter(DoctorModel.location.icontains(location, autoescape=True))
+    # Array filters require every requested value (ARRAY @> ARRAY), served by the GIN indexes
+    if languages:
+        query = query.filter(DoctorModel.languages.contains(languages))
+    if insurance_accepted:
+        query = query.filter(DoctorModel.insurance_accepted.contains(insurance_accepted))
+    if specializations:
+        query = query.filter(DoctorModel.specializations.contains(specializations))
+    if min_fee is not None:
+        query = query.filter(DoctorModel.consultation_fee >= min_fee)
+    if max_fee is not None:
+        query = query.filter(DoctorModel.consultation_fee <= max_fee)
+    if min_rating is not None:
+        query = query.filter(DoctorModel.rating >= min_rating)
+
+    doctors = query.order_by(*SORT_ORDERS[sort]).offset(offset).limit(limit).all()
+    return JSONResponse(content=[doctor_to_dict(doctor) for doctor in doctors])
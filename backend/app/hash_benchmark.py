@@ -0,0 +1,86 @@
+"""Password hashing micro-benchmark for sizing auth capacity.
+
+    python -m app.hash_benchmark [--seconds 3] [--workers N]
+        [--bcrypt-rounds 10 11 12 13] [--argon2 19456:2 65536:3]
+
+For each candidate policy it reports the time per hash and hashes/sec on one
+core, then hashes/sec with N worker processes hashing at once (the same setup
+as the HashingPool with AUTH_HASH_WORKERS=N). Peak logins/sec for a worker is
+roughly the last column; pick the highest cost whose per-hash time is still
+acceptable for a single login, and set AUTH_HASH_SCHEME and its cost settings
+accordingly. Run it on the deployment hardware, not a laptop.
+"""
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .hashing import make_context, setting
+
+
+def _timed_hashes(policy: dict, seconds: float) -> tuple[int, float]:
+    context = make_context(**policy)
+    context.hash("warm up")
+    count = 0
+    started = time.perf_counter()
+    deadline = started + seconds
+    while time.perf_counter() < deadline:
+        context.hash("correct horse battery staple")
+        count += 1
+    return count, time.perf_counter() - started
+
+
+def _describe(policy: dict) -> str:
+    if policy["scheme"] == "bcrypt":
+        return f"bcrypt rounds={policy['bcrypt_rounds']}"
+    return f"argon2id m={policy['argon2_memory_cost']} t={policy['argon2_time_cost']} p={policy['argon2_parallelism']}"
+
+
+def _current_policy() -> dict:
+    policy = {"scheme": setting.auth_hash_scheme}
+    if setting.auth_hash_scheme == "bcrypt":
+        policy["bcrypt_rounds"] = setting.auth_bcrypt_rounds
+    else:
+        policy.update(
+            argon2_memory_cost=setting.auth_argon2_memory_cost,
+            argon2_time_cost=setting.auth_argon2_time_cost,
+            argon2_parallelism=setting.auth_argon2_parallelism,
+        )
+    return policy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure password hashing throughput per core")
+    parser.add_argument("--seconds", type=float, default=3, help="measuring time per policy and mode")
+    parser.add_argument("--workers", type=int, default=setting.auth_hash_workers)
+    parser.add_argument("--bcrypt-rounds", type=int, nargs="*", default=[10, 11, 12, 13])
+    parser.add_argument("--argon2", nargs="*", default=["19456:2", "65536:3"], metavar="MEMORY_KIB:TIME_COST")
+    args = parser.parse_args()
+
+    policies = [{"scheme": "bcrypt", "bcrypt_rounds": rounds} for rounds in args.bcrypt_rounds]
+    for spec in args.argon2:
+        memory_cost, time_cost = (int(part) for part in spec.split(":"))
+        policies.append({
+            "scheme": "argon2",
+            "argon2_memory_cost": memory_cost,
+            "argon2_time_cost": time_cost,
+            "argon2_parallelism": setting.auth_argon2_parallelism,
+        })
+    current = _current_policy()
+    if current not in policies:
+        policies.append(current)
+
+    print(f"{'policy':<40} {'ms/hash':>8} {'hashes/s/core':>14} {f'hashes/s ({args.workers} procs)':>22}")
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for policy in policies:
+            count, elapsed = _timed_hashes(policy, args.seconds)
+            single = count / elapsed
+
+            results = list(pool.map(_timed_hashes, [policy] * args.workers, [args.seconds] * args.workers))
+            parallel = sum(count / elapsed for count, elapsed in results)
+
+            label = _describe(policy) + (" (current)" if policy == current else "")
+            print(f"{label:<40} {1000 / single:>8.1f} {single:>14.1f} {parallel:>22.1f}")
+
+
+if __name__ == "__main__":
+    main()
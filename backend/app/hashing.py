@@ -0,0 +1,154 @@
+"""Password hashing in a dedicated process pool.
+
+bcrypt costs 100-300 ms of CPU per call. Run inline it holds the GIL and a
+threadpool slot for that long, so a burst of logins stalls every other
+endpoint. HashingPool runs hash/verify in worker processes sized to the
+cores given to auth, and sheds load with a 503 once `max_pending` calls are
+already queued rather than letting the backlog grow without bound.
+
+Every uvicorn worker starts its own pool, so a host runs uvicorn workers x
+AUTH_HASH_WORKERS hashing processes (plus AI_LOCAL_WORKERS inference
+processes per uvicorn worker with the local AI backend). The default of 2
+suits a single uvicorn worker on a small host; with N uvicorn workers, set
+AUTH_HASH_WORKERS to roughly the cores reserved for auth divided by N.
+
+The hashing policy (scheme and cost) comes from settings; hashes made under
+an older policy still verify and are replaced on the next successful login.
+Use `python -m app.hash_benchmark` to pick costs for the deployment hardware.
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from .schema import Settings
+
+setting = Settings()
+
+def make_context(scheme: str = "bcrypt", bcrypt_rounds: int = 12, argon2_memory_cost: int = 65536,
+                 argon2_time_cost: int = 3, argon2_parallelism: int = 1) -> CryptContext:
+    """CryptContext hashing with `scheme` at the given cost.
+
+    Both schemes stay verifiable; hashes in the other scheme, or with a lower
+    bcrypt cost or different argon2 parameters, are reported by needs_update().
+    """
+    return CryptContext(
+        schemes=["argon2", "bcrypt"],
+        default=scheme,
+        deprecated="auto",
+        bcrypt__default_rounds=bcrypt_rounds,
+        bcrypt__min_desired_rounds=bcrypt_rounds,
+        argon2__type="ID",
+        argon2__memory_cost=argon2_memory_cost,
+        argon2__time_cost=argon2_time_cost,
+        argon2__parallelism=argon2_parallelism,
+    )
+
+
+pwd_context = make_context(
+    setting.auth_hash_scheme,
+    bcrypt_rounds=setting.auth_bcrypt_rounds,
+    argon2_memory_cost=setting.auth_argon2_memory_cost,
+    argon2_time_cost=setting.auth_argon2_time_cost,
+    argon2_parallelism=setting.auth_argon2_parallelism,
+)
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(password: str, hashed: str) -> bool:
+    return pwd_context.verify(password, hashed)
+
+
+def _verify_and_update(password: str, hashed: str) -> tuple[bool, str | None]:
+    return pwd_context.verify_and_update(password, hashed)
+
+
+class HashingPool:
+    def __init__(self, workers: int = 2, max_pending: int = 64):
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self._pool: ProcessPoolExecutor | None = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+
+    async def start(self):
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        # Spawn the workers now rather than on the first login
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._pool, os.getpid) for _ in range(self.workers)))
+
+    async def close(self):
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            # Joining the worker processes blocks, so wait for it off the event loop
+            await asyncio.to_thread(pool.shutdown, cancel_futures=True)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(_verify, password, hashed)
+
+    async def verify_and_update(self, password: str, hashed: str) -> tuple[bool, str | None]:
+        """Verify, and return a new hash as well if `hashed` is below the current policy"""
+        return await self._run(_verify_and_update, password, hashed)
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        self.pending += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+            self.total_seconds += time.perf_counter() - started
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": min(self.pending, self.workers),
+            "queued": max(self.pending - self.workers, 0),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            # Includes time spent queued behind other calls
+            "avg_seconds": self.total_seconds / self.completed if self.completed else 0.0,
+        }
+
+
+hash_pool: HashingPool | None = None
+
+
+def get_pool() -> HashingPool:
+    if hash_pool is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Password hashing is not available")
+    return hash_pool
+
+
+async def startup():
+    global hash_pool
+    hash_pool = HashingPool(workers=setting.auth_hash_workers, max_pending=setting.auth_hash_max_pending)
+    await hash_pool.start()
+
+
+async def shutdown():
+    global hash_pool
+    if hash_pool is not None:
+        await hash_pool.close()
+        hash_pool = None
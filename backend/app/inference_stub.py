@@ -0,0 +1,55 @@
+"""Local stand-in for the Hugging Face sentiment inference API.
+
+Run it next to the backend and point the AI router at it:
+
+    uvicorn app.inference_stub:app --port 8001
+    AI_API_URL=http://localhost:8001/models/sentiment uvicorn app.main:app
+
+Scores are derived from a small keyword list, so responses are deterministic
+and cost no quota. STUB_LATENCY_MS adds an artificial per-call delay and
+STUB_STATUS_CODE forces an error status, to exercise timeouts and 429 handling.
+"""
+import asyncio
+import os
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+app = FastAPI()
+
+LATENCY = float(os.getenv("STUB_LATENCY_MS", "0")) / 1000
+STATUS_CODE = int(os.getenv("STUB_STATUS_CODE", "200"))
+
+POSITIVE_WORDS = {"good", "great", "happy", "love", "better", "thanks", "fine", "well"}
+NEGATIVE_WORDS = {"bad", "pain", "sick", "hate", "worse", "hurt", "sad", "tired"}
+
+
+def classify(text: str) -> list:
+    words = set(text.lower().split())
+    positive = len(words & POSITIVE_WORDS)
+    negative = len(words & NEGATIVE_WORDS)
+    total = positive + negative + 1
+    scores = {
+        "positive": positive / total,
+        "negative": negative / total,
+        "neutral": 1 / total,
+    }
+    return sorted(
+        ({"label": label, "score": score} for label, score in scores.items()),
+        key=lambda item: item["score"],
+        reverse=True,
+    )
+
+
+@app.post("/models/{model_id:path}")
+async def infer(model_id: str, request: Request):
+    if LATENCY:
+        await asyncio.sleep(LATENCY)
+    if STATUS_CODE != 200:
+        return JSONResponse(status_code=STATUS_CODE, content={"error": "stubbed failure"})
+
+    inputs = (await request.json())["inputs"]
+    # Like the real API, a single string and a list of strings both return one result per input
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    return [classify(text) for text in inputs]
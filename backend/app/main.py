@@ -1,9 +1,26 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app import rooms , ai , feedback
-from . import authentication , medicines , feed , finddoctors , ws_wrtc 
-app=FastAPI()
+from . import authentication , medicines , feed , finddoctors , ws_wrtc , search , metrics , hashing , revocation
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await ai.startup()
+    await hashing.startup()
+    await revocation.startup()
+    await ws_wrtc.startup()
+    yield
+    await ws_wrtc.shutdown()
+    await revocation.shutdown()
+    await hashing.shutdown()
+    await ai.shutdown()
+
+
+app=FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -11,6 +28,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all methods
     allow_headers=["*"],  # Allow all headers
+    expose_headers=[feed.NEXT_CURSOR_HEADER],  # Let browsers read pagination cursors
 )
 
 
@@ -19,7 +37,9 @@ app.include_router(authentication.router , prefix= "/authenticate")
 app.include_router(feed.router , prefix= "/feed")
 app.include_router(medicines.router , prefix= "/medicines")
 app.include_router(finddoctors.router , prefix= "/finddoctors")
+app.include_router(search.router , prefix= "/search")
 app.include_router(ws_wrtc.router , prefix= "/websockets")
 app.include_router(rooms.router , prefix= "/rooms")
 app.include_router(ai.router , prefix= "/ai")
 app.include_router(feedback.router , prefix= "/feedback")
+app.include_router(metrics.router , prefix= "/metrics")
@@ -1,12 +1,52 @@
-from fastapi import APIRouter , Depends
-from sqlalchemy.orm import Session
-from app.database import get_db
+from typing import List, Literal, Optional
+from fastapi import APIRouter , Depends , Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.models import Medicine
+from app.schema import MedicineSchema
 
 
 router = APIRouter( tags=["medicines"])
 
-@router.get("/")
-async def get_medicines( db : Session = Depends(get_db)):
-    medicines = db.query(Medicine).all()
-    return medicines
\ No newline at end of file
+# Every sort ends on the primary key so limit/offset pages are stable
+SORT_ORDERS = {
+    "name": (Medicine.name.asc(), Medicine.id.asc()),
+    "price_asc": (Medicine.price.asc(), Medicine.id.asc()),
+    "price_desc": (Medicine.price.desc(), Medicine.id.asc()),
+    "rating": (Medicine.rating.desc().nulls_last(), Medicine.id.asc()),
+}
+
+@router.get("/", response_model=List[MedicineSchema])
+async def get_medicines(
+    category: Optional[str] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    requires_prescription: Optional[bool] = None,
+    min_rating: Optional[float] = Query(None, ge=0, le=5),
+    name_prefix: Optional[str] = Query(None, min_length=1),
+    q: Optional[str] = Query(None, min_length=1, description="Case-insensitive substring of the name"),
+    sort: Literal["name", "price_asc", "price_desc", "rating"] = "name",
+    limit: Optional[int] = Query(None, ge=1, le=200, description="Page size; omit for the full list"),
+    offset: int = Query(0, ge=0),
+    db : AsyncSession = Depends(get_async_db)
+):
+    query = select(Medicine)
+    if category is not None:
+        query = query.where(Medicine.category == category)
+    if min_price is not None:
+        query = query.where(Medicine.price >= min_price)
+    if max_price is not None:
+        query = query.where(Medicine.price <= max_price)
+    if requires_prescription is not None:
+        query = query.where(Medicine.requires_prescription == requires_prescription)
+    if min_rating is not None:
+        query = query.where(Medicine.rating >= min_rating)
+    if name_prefix:
+        # Matches ix_medicines_name_lower, so the prefix is an index range scan
+        query = query.where(func.lower(Medicine.name).startswith(name_prefix.lower(), autoescape=True))
+    if q:
+        query = query.where(Medicine.name.icontains(q, autoescape=True))
+
+    medicines = await db.scalars(query.order_by(*SORT_ORDERS[sort]).offset(offset).limit(limit))
+    return medicines.all()
@@ -0,0 +1,42 @@
+from fastapi import APIRouter
+
+from . import ai, hashing, oauth2
+from .revocation import revocations
+from .database import async_engine, engine, pool_status
+from .room_cache import room_credentials
+from .ws_wrtc import room_manager
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/pool")
+def get_pool_metrics():
+    return {
+        "sync": pool_status(engine.pool),
+        "async": pool_status(async_engine.pool),
+    }
+
+
+@router.get("/ai")
+def get_ai_metrics():
+    return {
+        "cache": ai.response_cache.stats() if ai.response_cache else None,
+        "batching": ai.batcher.stats() if ai.batcher else None,
+    }
+
+
+@router.get("/rooms")
+def get_room_metrics():
+    return {
+        "credentials_cache": room_credentials.stats(),
+        "signaling": room_manager.stats(),
+    }
+
+
+@router.get("/auth")
+def get_auth_metrics():
+    return {
+        "hashing": hashing.hash_pool.stats() if hashing.hash_pool else None,
+        "token_cache": oauth2.verified_tokens.stats(),
+        "revocations": revocations.stats(),
+    }
@@ -1,7 +1,8 @@
 from datetime import datetime
-from sqlalchemy import JSON, DateTime, Float, Column, Integer, String, Boolean, ForeignKey, ARRAY, Text
+from sqlalchemy import JSON, DateTime, Float, Column, Integer, String, Boolean, ForeignKey, Text, Index, Computed, func
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR  # Dialect ARRAY provides the @> containment operator
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 
 Base = declarative_base()
 
@@ -13,25 +14,49 @@ class users(Base):  # Changed class name to follow Python naming conventions
     firstname = Column(String, nullable=False, index=True)
     lastname = Column(String, nullable=False, index=True)
     email = Column(String, nullable=False, unique=True, index=True)
-    password = Column(String, unique=True, nullable=False, index=True)
+    password = Column(String, nullable=False)  # salted hash; never looked up, so not indexed
+
+
+class RevokedToken(Base):
+    """Refresh token ids (jti) that were used or logged out, and revoked token families ("fam:<id>")"""
+
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String, primary_key=True)
+    expires_at = Column(DateTime, nullable=False, index=True)  # rows past this can be purged
+    revoked_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
 #--------------------BuyMedicine--------------------
 class Medicine(Base):
     __tablename__ = "medicines"
-    
+    __table_args__ = (
+        Index('ix_medicines_search_vector', 'search_vector', postgresql_using='gin'),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
-    price = Column(Float)
-    category = Column(String)
+    price = Column(Float, index=True)
+    category = Column(String, index=True)
     stock = Column(Integer)
     description = Column(String, nullable=True)
     dosage = Column(String, nullable=True)
     requires_prescription = Column(Boolean, default=False)
-    rating = Column(Float, nullable=True)
+    rating = Column(Float, nullable=True, index=True)
     reviews = Column(Integer, nullable=True)
     discount = Column(Integer, nullable=True)
     expiry = Column(String, nullable=True)
     manufacturer = Column(String, nullable=True)
+    # Generated by Postgres on every insert/update, so it can never drift from the text columns
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(manufacturer, '')), 'C')",
+        persisted=True
+    )))
+
+# Case-insensitive name prefix search (lower(name) LIKE 'abc%') needs pattern ops to use a B-tree
+Index('ix_medicines_name_lower', func.lower(Medicine.name).label('name_lower'),
+      postgresql_ops={'name_lower': 'text_pattern_ops'})
 
 #---------------------END---------------------------------
 
@@ -52,11 +77,15 @@ class Author(Base):
 
 class Comment(Base):
     __tablename__ = 'comments'
+    __table_args__ = (
+        # Serves the newest-N-comments-per-post window and the per-post comment cursor
+        Index('ix_comments_post_id_timestamp_id', 'post_id', 'timestamp', 'id'),
+    )
 
     id = Column(String, primary_key=True)
     author_id = Column(String, ForeignKey('authors.id'), nullable=False)
     content = Column(String, nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, nullable=False, default=datetime.utcnow)  # keyset cursor key, so never NULL
     likes = Column(Integer, default=0)
     post_id = Column(String, ForeignKey('posts.id'), nullable=False)  # Added post_id for relationship
 
@@ -66,11 +95,15 @@ class Comment(Base):
 
 class Post(Base):
     __tablename__ = 'posts'
+    __table_args__ = (
+        # Serves the (timestamp, id) keyset cursor of the feed
+        Index('ix_posts_timestamp_id', 'timestamp', 'id'),
+    )
 
     id = Column(String, primary_key=True)
     author_id = Column(String, ForeignKey('authors.id'), nullable=False)
     content = Column(String, nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, nullable=False, default=datetime.utcnow)  # keyset cursor key, so never NULL
     likes = Column(Integer, default=0)
     liked = Column(Boolean, default=False)
     shares = Column(Integer, default=0)
@@ -91,11 +124,21 @@ class Post(Base):
 
 class DoctorModel(Base):
     __tablename__ = 'doctors'
+    __table_args__ = (
+        # GIN indexes answer the array containment (@>) filters of the doctor search
+        Index('ix_doctors_languages', 'languages', postgresql_using='gin'),
+        Index('ix_doctors_insurance_accepted', 'insurance_accepted', postgresql_using='gin'),
+        Index('ix_doctors_specializations', 'specializations', postgresql_using='gin'),
+        Index('ix_doctors_search_vector', 'search_vector', postgresql_using='gin'),
+        # Trigram GIN index (pg_trgm) for the substring ILIKE filter on location
+        Index('ix_doctors_location_trgm', 'location', postgresql_using='gin',
+              postgresql_ops={'location': 'gin_trgm_ops'}),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String, nullable=False)
     speciality = Column(String, nullable=False)
-    rating = Column(Float, nullable=False)
+    rating = Column(Float, nullable=False, index=True)
     reviews = Column(Integer, nullable=False)
     experience = Column(String, nullable=False)
     image = Column(String, nullable=True)
@@ -104,7 +147,7 @@ class DoctorModel(Base):
     patients = Column(String, nullable=False)
     education = Column(String, nullable=False)
     languages = Column(ARRAY(String), nullable=False)  # Assuming languages are stored as an array of strings
-    consultation_fee = Column(Float, nullable=False)
+    consultation_fee = Column(Float, nullable=False, index=True)
     availability = Column(ARRAY(String), nullable=False)  # Assuming availability is stored as an array of strings
     verified = Column(Boolean, default=False)
     awards = Column(Integer, nullable=False)
@@ -113,6 +156,15 @@ class DoctorModel(Base):
     specializations = Column(ARRAY(String), nullable=False)  # Assuming specializations are stored as an array of strings
     insurance_accepted = Column(ARRAY(String), nullable=False)  # Assuming insurance accepted is stored as an array of strings
     hospital_affiliations = Column(ARRAY(String), nullable=False)  # Assuming hospital affiliations are stored as an array of strings
+    # Generated column, kept in sync by Postgres like Medicine.search_vector
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(speciality, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(bio, '')), 'B')",
+        persisted=True
+    )))
+
+Index('ix_doctors_speciality_lower', func.lower(DoctorModel.speciality))
 
 #---------------------END---------------------------------
 
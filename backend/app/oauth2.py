@@ -1,13 +1,15 @@
 import jwt
-from passlib.context import CryptContext
+import uuid
 from datetime import timedelta , datetime , timezone
 from jwt.exceptions import InvalidTokenError 
-from pydantic import EmailStr
+from pathlib import Path
 from typing import Annotated 
 from fastapi import Depends , HTTPException , status
 from fastapi.security import OAuth2PasswordBearer
 
+from . import hashing
 from .schema import TokenData , Settings
+from .token_cache import VerifiedTokenCache
 
 setting = Settings()
 
@@ -15,9 +17,26 @@ setting = Settings()
 SECRET_KEY = setting.secret_key
 ALGORITHM = setting.algorithm
 EXPIRATION_TIME = int(setting.expiration_time)
+REFRESH_EXPIRATION = timedelta(days=setting.refresh_token_expiration_days)
+
+# HS* algorithms sign and verify with SECRET_KEY. For RS*/ES*/EdDSA, tokens are signed with the
+# private key and verified with the public key, which other services can use to verify locally.
+if ALGORITHM.startswith("HS"):
+    SIGNING_KEY = VERIFYING_KEY = SECRET_KEY
+else:
+    if not setting.jwt_public_key_file:
+        raise RuntimeError(f"ALGORITHM={ALGORITHM} verifies tokens with a public key; set JWT_PUBLIC_KEY_FILE")
+    SIGNING_KEY = Path(setting.jwt_private_key_file).read_text() if setting.jwt_private_key_file else None
+    VERIFYING_KEY = Path(setting.jwt_public_key_file).read_text()
 
 Oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
-pwd_context = CryptContext(schemes=["bcrypt"] , deprecated="auto")
+
+# Built once and re-raised; the traceback is reset on each raise so it does not accumulate
+CREDENTIALS_EXCEPTION = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED 
+                           , detail="Could not validate your credentials",
+                           headers={"WWW-Authenticate" : "Bearer"})
+
+verified_tokens = VerifiedTokenCache(max_entries=setting.jwt_cache_max_entries)
 
 
 
@@ -29,45 +48,75 @@ def create_token( data : dict , token_validity : timedelta | None = None):
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=EXPIRATION_TIME)
     to_encode.update({"exp" : expire})
-    encoded_jwt = jwt.encode(to_encode , SECRET_KEY , algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode , SIGNING_KEY , algorithm=ALGORITHM)
     return encoded_jwt
 
 
 
 
+def create_refresh_token( u_id : int , family : str | None = None):
+    # jti identifies this token for rotation; fam is shared by every token rotated from one login
+    return create_token(
+        data={"u_id" : u_id , "type" : "refresh" , "jti" : uuid.uuid4().hex , "fam" : family or uuid.uuid4().hex},
+        token_validity=REFRESH_EXPIRATION,
+    )
+
+
+
+
+def decode_refresh_token(token : str) -> dict:
+    try:
+        payload = jwt.decode(token , VERIFYING_KEY , algorithms= [ALGORITHM] , options={"require": ["exp", "jti", "fam"]})
+    except InvalidTokenError:
+        raise CREDENTIALS_EXCEPTION.with_traceback(None)
+    if payload.get("type") != "refresh" or payload.get("u_id") is None:
+        raise CREDENTIALS_EXCEPTION.with_traceback(None)
+    return payload
+
+
+
+
+
+def verify_access_token(token : str , credentials_exception = CREDENTIALS_EXCEPTION) -> TokenData:
+    cached = verified_tokens.get(token)
+    if cached is not None:
+        return cached
 
-def verify_access_token(token : str , credentials_exception) -> TokenData:
-    
     try:
-        payload = jwt.decode(token , SECRET_KEY , algorithms= [ALGORITHM])
-        useremailid : EmailStr = payload.get("user")
-        token_data = TokenData(emailid=useremailid)
-        if useremailid is None : 
-            raise credentials_exception
+        payload = jwt.decode(token , VERIFYING_KEY , algorithms= [ALGORITHM] , options={"require": ["exp"]})
+        u_id = payload.get("u_id")
+        if u_id is None or payload.get("type") == "refresh" : 
+            raise credentials_exception.with_traceback(None)
+        token_data = TokenData(u_id=u_id)
     
     except InvalidTokenError:
-        raise credentials_exception
+        raise credentials_exception.with_traceback(None)
     
+    verified_tokens.set(token , payload["exp"] , token_data)
     return token_data
 
 
 
 
 
-def get_current_user(token : Annotated[str , Depends(Oauth2_scheme)]):
-    credentials_exception = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED 
-                           , detail="Could not validate your credentials",
-                           headers={"WWW-Authenticate" : "Bearer"})
-    return verify_access_token(token ,credentials_exception)
+async def get_current_user(token : Annotated[str , Depends(Oauth2_scheme)]):
+    # Async so a cache hit costs no threadpool hop, and the token cache is only touched from the event loop
+    return verify_access_token(token)
+
+
+
+
+async def hashpassword(password):
+    return await hashing.get_pool().hash(password)
 
 
 
 
-def hashpassword(password):
-    return pwd_context.hash(password)
+async def verify(plain_password : str , hashed_password : str ):
+    return await hashing.get_pool().verify(plain_password,hashed_password)
 
 
 
 
-def verify(plain_password : str , hashed_password : str ):
-    return (pwd_context.verify(plain_password,hashed_password))
\ No newline at end of file
+async def verify_and_update(plain_password : str , hashed_password : str ):
+    return await hashing.get_pool().verify_and_update(plain_password,hashed_password)
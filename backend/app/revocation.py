@@ -0,0 +1,82 @@
+"""Revocation list for refresh tokens.
+
+The revoked_tokens table is the only revocation check: /refresh reads the
+token family there and records the used jti there, so every worker sees a
+revocation as soon as it commits.
+
+revoke() relies on the primary key of revoked_tokens: of two concurrent
+attempts to revoke the same jti only one insert succeeds, which is how
+refresh-token reuse is detected across workers. Every /refresh adds a row,
+so rows past their token's expiry are purged every
+`revocation_purge_interval` seconds.
+"""
+import asyncio
+import logging
+from datetime import datetime
+
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import AsyncSessionLocal, setting
+from .models import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationStore:
+    def __init__(self):
+        self.revoked = 0
+        self.reuse_detected = 0
+        self.purged = 0
+
+    async def purge_expired(self, db: AsyncSession) -> int:
+        result = await db.execute(delete(RevokedToken).where(RevokedToken.expires_at < datetime.utcnow()))
+        await db.commit()
+        self.purged += result.rowcount
+        return result.rowcount
+
+    async def revoke(self, db: AsyncSession, jti: str, expires_at: datetime) -> bool:
+        """Persist a revocation; False if `jti` was already revoked (by any worker)"""
+        db.add(RevokedToken(jti=jti, expires_at=expires_at))
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            self.reuse_detected += 1
+            return False
+        self.revoked += 1
+        return True
+
+    def stats(self) -> dict:
+        return {"revoked": self.revoked, "reuse_detected": self.reuse_detected, "purged": self.purged}
+
+
+revocations = RevocationStore()
+purge_task: asyncio.Task | None = None
+
+
+async def _purge_periodically():
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                await revocations.purge_expired(db)
+        except Exception as e:
+            logger.error(f"Could not purge expired revoked tokens: {e}")
+        await asyncio.sleep(setting.revocation_purge_interval)
+
+
+async def startup():
+    global purge_task
+    purge_task = asyncio.create_task(_purge_periodically())
+
+
+async def shutdown():
+    global purge_task
+    if purge_task is not None:
+        purge_task.cancel()
+        try:
+            await purge_task
+        except asyncio.CancelledError:
+            pass
+        purge_task = None
@@ -0,0 +1,69 @@
+"""Short-lived cache of room credentials for WebSocket admission.
+
+Maps join_code to a SHA-256 digest of the room password (or None for an
+unknown room), so a reconnect storm costs one database lookup per room per
+TTL instead of one per connection attempt. rooms.create_room and
+rooms.delete_room invalidate the entry on this worker; other workers see the
+change once their entry expires.
+"""
+import asyncio
+import hashlib
+import hmac
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from .database import setting
+
+
+def password_digest(password: str) -> bytes:
+    return hashlib.sha256(password.encode()).digest()
+
+
+class RoomCredentialsCache:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[int, tuple[float, Optional[bytes]]] = {}
+        self._inflight: Dict[int, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, join_code: int, load: Callable[[int], Awaitable[Optional[str]]]) -> Optional[bytes]:
+        """Return the cached digest, calling `load` (at most once per join_code at a time) on a miss"""
+        entry = self._entries.get(join_code)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+
+        # Concurrent misses for the same room share one lookup
+        if join_code in self._inflight:
+            return await asyncio.shield(self._inflight[join_code])
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[join_code] = future
+        try:
+            stored = await load(join_code)
+            digest = password_digest(stored) if stored is not None else None
+            self._entries[join_code] = (time.monotonic() + self.ttl, digest)
+            future.set_result(digest)
+            return digest
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # waiters re-raise it; do not warn when there are none
+            raise
+        finally:
+            del self._inflight[join_code]
+
+    def invalidate(self, join_code: int):
+        self._entries.pop(join_code, None)
+
+    async def verify(self, join_code: int, password: str,
+                     load: Callable[[int], Awaitable[Optional[str]]]) -> bool:
+        digest = await self.get(join_code, load)
+        return digest is not None and hmac.compare_digest(digest, password_digest(password))
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+room_credentials = RoomCredentialsCache(ttl=setting.room_cache_ttl)
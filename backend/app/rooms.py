@@ -2,17 +2,19 @@ from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from datetime import datetime, time
 from app.models import RoomModel, ParticipantModel
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from .schema import RoomCreate, ParticipantCreate, SendRoomDetails
+from .room_cache import room_credentials
 
 router = APIRouter()
 
 
 
 @router.get("/get_room_details", response_model=list[SendRoomDetails])
-async def get_room_details(id: int, db: Session = Depends(get_db)):
-    rooms = db.query(RoomModel).filter(RoomModel.id == id).all()
+async def get_room_details(id: int, db: AsyncSession = Depends(get_async_db)):
+    rooms = (await db.scalars(select(RoomModel).where(RoomModel.id == id))).all()
     return [{
         "join_code": room.join_code,
         "password": room.password,
@@ -23,7 +25,7 @@ async def get_room_details(id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/create_room", response_model=dict)
-async def create_room(room: RoomCreate, db: Session = Depends(get_db)):
+async def create_room(room: RoomCreate, db: AsyncSession = Depends(get_async_db)):
     db_room = RoomModel(
         id = room.id , 
         room_name = room.room_name,
@@ -32,14 +34,16 @@ async def create_room(room: RoomCreate, db: Session = Depends(get_db)):
         last_activity=datetime.utcnow()
     )
     db.add(db_room)
-    db.commit()
-    db.refresh(db_room)
+    await db.commit()
+    await db.refresh(db_room)
+    # Drop a cached "no such room" answer so the creator can connect straight away
+    room_credentials.invalidate(db_room.join_code)
     return {"join_code": db_room.join_code}
 
 @router.post("/join_room", response_model=dict) 
-async def join_room(participant: ParticipantCreate, db: Session = Depends(get_db)):
+async def join_room(participant: ParticipantCreate, db: AsyncSession = Depends(get_async_db)):
     # Verify room exists
-    room = db.query(RoomModel).filter(RoomModel.join_code == participant.join_code).first()
+    room = await db.get(RoomModel, participant.join_code)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
         
@@ -47,34 +51,35 @@ async def join_room(participant: ParticipantCreate, db: Session = Depends(get_db
         join_code=participant.join_code
     )
     db.add(db_participant)
-    db.commit()
-    db.refresh(db_participant)
+    await db.commit()
+    await db.refresh(db_participant)
     return {"join_code": db_participant.join_code}
 
 
 @router.get("/get_room_details", response_model=list[SendRoomDetails])
-async def get_room_details(id: int, db: Session = Depends(get_db)):
-    rooms = db.query(RoomModel).filter(RoomModel.id == id).all()
+async def get_room_details(id: int, db: AsyncSession = Depends(get_async_db)):
+    rooms = (await db.scalars(select(RoomModel).where(RoomModel.id == id))).all()
     return [{"join_code": room.join_code, "password": room.password, 
              "room_name": room.room_name , "date": room.last_activity.date().isoformat(),
              "time": f"{room.last_activity.strftime('%I:%M')} {room.last_activity.strftime('%p')}"} for room in rooms]   
 
 @router.get("/delete_room", response_model=dict)
-async def delete_room(join_code: int, db: Session = Depends(get_db)):
-    room = db.query(RoomModel).filter(RoomModel.join_code == join_code).first()
+async def delete_room(join_code: int, db: AsyncSession = Depends(get_async_db)):
+    room = await db.get(RoomModel, join_code)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
     
     # Delete participants associated with the room before deleting the room
-    db.query(ParticipantModel).filter(ParticipantModel.join_code == join_code).delete()
+    await db.execute(delete(ParticipantModel).where(ParticipantModel.join_code == join_code))
     
-    db.delete(room)
-    db.commit()
+    await db.delete(room)
+    await db.commit()
+    room_credentials.invalidate(join_code)
     return {"message": "Room deleted successfully"}
 
 @router.get("/get_room_details_by_join_code")
-async def get_room_details_by_join_code(join_code: int, db: Session = Depends(get_db)):
-    room = db.query(RoomModel).filter(RoomModel.join_code == join_code).first()
+async def get_room_details_by_join_code(join_code: int, db: AsyncSession = Depends(get_async_db)):
+    room = await db.get(RoomModel, join_code)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
     return {"join_code": room.join_code, "password": room.password}
\ No newline at end of file
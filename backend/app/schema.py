@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from datetime import date, datetime,time
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -16,13 +16,16 @@ class User(BaseModel):
 class Token(BaseModel):
     access_token : str 
     token_type : str
+    refresh_token : Optional[str] = None
     class Config:
         orm_mode = True
 
-class TokenData:
+class TokenData(BaseModel):
     u_id : int
-    class Config:
-        orm_mode = True
+
+
+class RefreshRequest(BaseModel):
+    refresh_token : str
 
 
 class AuthorSchema(BaseModel):
@@ -55,6 +58,24 @@ class PostSchema(BaseModel):
     completed_time: str = None
 
 
+class MedicineSchema(BaseModel):
+    id: int
+    name: Optional[str] = None
+    price: Optional[float] = None
+    category: Optional[str] = None
+    stock: Optional[int] = None
+    description: Optional[str] = None
+    dosage: Optional[str] = None
+    requires_prescription: Optional[bool] = None
+    rating: Optional[float] = None
+    reviews: Optional[int] = None
+    discount: Optional[int] = None
+    expiry: Optional[str] = None
+    manufacturer: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class TimeSlot(BaseModel):
     time: str
     available: bool
@@ -122,4 +143,52 @@ class Settings(BaseSettings):
     algorithm: str
     expiration_time: str
 
+    # Connection pool, applied to both the sync and the async engine
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800  # seconds; -1 disables recycling
+    db_pool_pre_ping: bool = True
+
+    # Asymmetric JWT algorithms (RS256, EdDSA, ...) read PEM keys from these files; the private
+    # key is only needed where tokens are issued
+    jwt_private_key_file: str | None = None
+    jwt_public_key_file: str | None = None
+    # Verified access tokens kept per worker, each only until its exp
+    jwt_cache_max_entries: int = 10000
+    # Refresh tokens are rotated on every use; used and logged-out ones go on the revocation list
+    refresh_token_expiration_days: int = 14
+    revocation_purge_interval: float = 3600  # seconds between deletes of expired revoked_tokens rows
+
+    # Password hashing process pool; calls beyond max_pending are refused with 503. Each uvicorn
+    # worker starts its own pool, so size it as (cores for auth) / (uvicorn workers)
+    auth_hash_workers: int = 2
+    auth_hash_max_pending: int = 64
+    # Hashing policy for new hashes; older hashes are upgraded on login. Tune with app.hash_benchmark
+    auth_hash_scheme: Literal["bcrypt", "argon2"] = "bcrypt"
+    auth_bcrypt_rounds: int = 12
+    auth_argon2_memory_cost: int = 65536  # KiB
+    auth_argon2_time_cost: int = 3
+    auth_argon2_parallelism: int = 1
+
+    # Seconds a room's credentials are cached for WebSocket admission
+    room_cache_ttl: float = 30
+
+    # Outbound WebSocket messages buffered per client before the slow-consumer policy applies
+    ws_send_queue_size: int = 256
+    ws_slow_consumer_policy: Literal["drop", "disconnect"] = "disconnect"
+    # Participant changes within this window are sent to the room as one participants_delta
+    ws_participants_debounce_ms: float = 100
+    # Every client is pinged once per interval and dropped if no pong arrives within the timeout
+    ws_heartbeat_interval: float = 30
+    ws_heartbeat_timeout: float = 75
+    ws_heartbeat_slots: int = 30
+    # Routes room traffic between workers; "none" keeps rooms local to one process
+    ws_backplane: Literal["none", "memory", "redis"] = "none"
+    ws_backplane_redis_url: str = "redis://localhost:6379/0"
+    # Workers announce themselves to their rooms every interval; participants of a worker not
+    # heard from within the ttl (e.g. it crashed without publishing `leave`) are dropped
+    ws_presence_interval: float = 10
+    ws_presence_ttl: float = 35
+
     model_config = SettingsConfigDict(env_file=".env")
\ No newline at end of file
@@ -0,0 +1,213 @@
+"""Flag indexes in models.py that no query in the app can use.
+
+    python -m app.schema_lint [--bench-signup N]
+
+Scans the app's modules for query paths, i.e. model columns referenced
+inside where/filter/order_by/join/over(...) calls (including through
+module-level names such as medicines.SORT_ORDERS), and reports every index
+whose leading column never appears in one, plus plain indexes that repeat
+the primary key. Expression indexes count the columns inside their first
+expression. It is a static heuristic: a finding means "check before
+keeping", not "drop". Unique indexes also enforce integrity, so they are
+reported separately.
+
+--bench-signup N inserts N synthetic users into copies of the users table in
+a scratch schema, once with every declared index and once without the
+flagged ones, and reports time, heap and index bytes, and WAL bytes written
+per row; the extra WAL and index pages are the write amplification each
+flagged index costs on signup. It needs the configured Postgres database
+and drops the scratch schema afterwards.
+"""
+import argparse
+import ast
+import secrets
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from sqlalchemy import Column, MetaData, text
+from sqlalchemy.sql import visitors
+
+from . import models
+
+QUERY_METHODS = {"where", "filter", "filter_by", "order_by", "join", "outerjoin", "group_by", "having", "distinct", "over"}
+APP_DIR = Path(__file__).resolve().parent
+BENCH_SCHEMA = "schema_lint_bench"
+
+
+def _model_tables() -> dict:
+    return {mapper.class_.__name__: mapper.local_table for mapper in models.Base.registry.mappers}
+
+
+def _attributes(node: ast.AST):
+    """(base name, attribute) for every `Name.attr` under node"""
+    for child in ast.walk(node):
+        if isinstance(child, ast.Attribute) and isinstance(child.value, ast.Name):
+            yield child.value.id, child.attr
+
+
+def find_query_columns(paths) -> dict:
+    """Map (table name, column name) to the file:line sites that use it in a query"""
+    tables = _model_tables()
+    tables_by_column = defaultdict(list)
+    for table in tables.values():
+        for column in table.columns:
+            tables_by_column[column.key].append(table)
+
+    used = defaultdict(set)
+    for path in paths:
+        tree = ast.parse(path.read_text(), filename=str(path))
+
+        # Names bound to expressions, so `order_by(*SORT_ORDERS[sort])` sees the columns inside
+        bound = defaultdict(list)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Assign):
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        bound[target.id].append(node.value)
+
+        for node in ast.walk(tree):
+            if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                    and node.func.attr in QUERY_METHODS):
+                continue
+            expressions = list(node.args) + [keyword.value for keyword in node.keywords]
+            for expression in list(expressions):
+                for child in ast.walk(expression):
+                    if isinstance(child, ast.Name):
+                        expressions.extend(bound.get(child.id, []))
+
+            site = f"{path.relative_to(APP_DIR.parent)}:{node.lineno}"
+            for expression in expressions:
+                for base, attr in _attributes(expression):
+                    if base in tables:
+                        candidates = [tables[base]] if attr in tables[base].columns else []
+                    else:
+                        # e.g. `model.search_vector` inside a loop over models: match by column name
+                        candidates = tables_by_column.get(attr, [])
+                    for table in candidates:
+                        used[(table.name, attr)].add(site)
+            if node.func.attr == "filter_by":
+                for keyword in node.keywords:
+                    for table in tables_by_column.get(keyword.arg, []):
+                        used[(table.name, keyword.arg)].add(site)
+    return used
+
+
+def _leading_columns(index) -> list:
+    first = index.expressions[0]
+    if isinstance(first, Column):
+        return [first.key]
+    return [element.key for element in visitors.iterate(first) if isinstance(element, Column)]
+
+
+def lint(paths=None) -> list:
+    """One finding per declared index: its name, table, leading columns, and the query sites using it"""
+    paths = paths or sorted(p for p in APP_DIR.glob("*.py") if p.name not in {"models.py", "schema_lint.py"})
+    used = find_query_columns(paths)
+    findings = []
+    for table in models.Base.metadata.sorted_tables:
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            leading = _leading_columns(index)
+            sites = sorted(set().union(*(used.get((table.name, column), set()) for column in leading)))
+            findings.append({
+                "table": table.name,
+                "index": index.name,
+                "columns": leading,
+                "unique": bool(index.unique),
+                # Postgres already indexes the primary key; a plain index on the same columns only adds writes
+                "duplicates_primary_key": [c.key for c in index.columns] == [c.key for c in table.primary_key.columns],
+                "sites": sites,
+            })
+    return findings
+
+
+def bench_signup(rows: int, drop: list, table_name: str = "users") -> list:
+    from .database import engine
+
+    source = models.Base.metadata.tables[table_name]
+    results = []
+    for label, dropped in (("declared indexes", set()), ("without flagged", set(drop))):
+        metadata = MetaData()
+        table = source.to_metadata(metadata, schema=BENCH_SCHEMA)
+        # Copied indexes are renamed for the scratch schema, so match them by their columns
+        dropped_columns = {tuple(c.key for c in index.columns) for index in source.indexes if index.name in dropped}
+        for index in list(table.indexes):
+            if tuple(c.key for c in index.columns) in dropped_columns:
+                table.indexes.discard(index)
+
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE"))
+            conn.execute(text(f"CREATE SCHEMA {BENCH_SCHEMA}"))
+            metadata.create_all(conn)
+        try:
+            batch = [_synthetic_user(table, i) for i in range(rows)]
+            with engine.begin() as conn:
+                wal_before = conn.execute(text("SELECT pg_current_wal_insert_lsn()")).scalar()
+                started = time.perf_counter()
+                for start in range(0, rows, 1000):
+                    conn.execute(table.insert(), batch[start:start + 1000])
+                elapsed = time.perf_counter() - started
+            with engine.begin() as conn:
+                wal = conn.execute(text("SELECT pg_wal_lsn_diff(pg_current_wal_insert_lsn(), :lsn)"),
+                                   {"lsn": wal_before}).scalar()
+                heap, indexes = conn.execute(
+                    text("SELECT pg_table_size(:t), pg_indexes_size(:t)"), {"t": f"{BENCH_SCHEMA}.{table_name}"}
+                ).one()
+        finally:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE"))
+
+        results.append({
+            "variant": label,
+            "indexes": len(table.indexes),
+            "rows_per_second": rows / elapsed,
+            "heap_bytes": heap,
+            "index_bytes": indexes,
+            "wal_bytes_per_row": float(wal) / rows,
+        })
+    return results
+
+
+def _synthetic_user(table, i: int) -> dict:
+    # Same shape as a real signup: unique email, 60-character bcrypt-style hash
+    values = {
+        "firstname": f"first{i}",
+        "lastname": f"last{i}",
+        "email": f"user{i}-{secrets.token_hex(4)}@example.com",
+        "password": "$2b$12$" + secrets.token_urlsafe(40)[:53],
+    }
+    return {key: value for key, value in values.items() if key in table.columns}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report indexes that no query path uses")
+    parser.add_argument("--bench-signup", type=int, metavar="N", help="measure users write amplification with N signups")
+    args = parser.parse_args()
+
+    findings = lint()
+    flagged = [finding for finding in findings if not finding["sites"] or finding["duplicates_primary_key"]]
+    for finding in findings:
+        columns = ", ".join(finding["columns"])
+        if finding["duplicates_primary_key"]:
+            status = "REDUNDANT (same columns as the primary key)"
+        elif finding["sites"]:
+            status = f"used    ({len(finding['sites'])} sites, e.g. {finding['sites'][0]})"
+        elif finding["unique"]:
+            status = "UNUSED  (unique: may still be needed for integrity)"
+        else:
+            status = "UNUSED"
+        print(f"{finding['table']:<14} {finding['index']:<40} {columns:<24} {status}")
+    print(f"\n{len(flagged)} of {len(findings)} indexes are unused or redundant")
+
+    if args.bench_signup:
+        drop = [finding["index"] for finding in flagged if finding["table"] == "users" and not finding["unique"]]
+        print(f"\nBulk signup into users, {args.bench_signup} rows; flagged: {', '.join(drop) or 'none'}")
+        print(f"{'variant':<18} {'indexes':>7} {'rows/s':>10} {'heap KiB':>10} {'index KiB':>10} {'WAL B/row':>10}")
+        for result in bench_signup(args.bench_signup, drop):
+            print(f"{result['variant']:<18} {result['indexes']:>7} {result['rows_per_second']:>10.0f} "
+                  f"{result['heap_bytes'] / 1024:>10.0f} {result['index_bytes'] / 1024:>10.0f} "
+                  f"{result['wal_bytes_per_row']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
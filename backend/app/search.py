@@ -0,0 +1,77 @@
+import re
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .database import get_db
+from .models import DoctorModel, Medicine
+
+router = APIRouter(tags=["search"])
+
+SEARCH_CONFIG = "english"
+# Shorter terms match whole words only: a one-letter prefix like "p:*" matches most of the table
+MIN_PREFIX_LENGTH = 3
+# Matches ranked per model; broad queries rank the first this many instead of every match
+SEARCH_CANDIDATES = 200
+
+
+def build_prefix_query(text: str) -> str | None:
+    """Turn free text into a to_tsquery expression where every term is a prefix match.
+
+    "cardio spani" becomes "cardio:* & spani:*", which lets the type-ahead match
+    "cardiology" and "Spanish" before the words are complete. Terms shorter than
+    MIN_PREFIX_LENGTH must match a whole word. Only word characters are kept, so
+    user input can never inject tsquery operators.
+    """
+    terms = re.findall(r"\w+", text.lower())
+    if not terms:
+        return None
+    return " & ".join(f"{term}:*" if len(term) >= MIN_PREFIX_LENGTH else term for term in terms)
+
+
+def _ranked(db: Session, model, columns, tsquery, limit: int):
+    # ts_rank_cd reads every row it ranks, so cap the candidates before ranking them
+    candidates = (
+        db.query(model.id)
+        .filter(model.search_vector.op("@@")(tsquery))
+        .limit(SEARCH_CANDIDATES)
+        .subquery()
+    )
+    rank = func.ts_rank_cd(model.search_vector, tsquery).label("rank")
+    return (
+        db.query(*columns, rank)
+        .join(candidates, candidates.c.id == model.id)
+        .order_by(rank.desc(), model.id.asc())
+        .limit(limit)
+        .all()
+    )
+
+
+@router.get("/")
+def search(
+    q: str = Query(..., min_length=1, max_length=100),
+    scope: Literal["all", "doctors", "medicines"] = "all",
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    results = {"doctors": [], "medicines": []}
+    prefix_query = build_prefix_query(q)
+    if prefix_query is None:
+        return results
+
+    tsquery = func.to_tsquery(SEARCH_CONFIG, prefix_query)
+    if scope in ("all", "doctors"):
+        rows = _ranked(db, DoctorModel, (DoctorModel.id, DoctorModel.name, DoctorModel.speciality), tsquery, limit)
+        results["doctors"] = [
+            {"id": row.id, "name": row.name, "speciality": row.speciality, "rank": row.rank}
+            for row in rows
+        ]
+    if scope in ("all", "medicines"):
+        rows = _ranked(db, Medicine, (Medicine.id, Medicine.name, Medicine.category, Medicine.price), tsquery, limit)
+        results["medicines"] = [
+            {"id": row.id, "name": row.name, "category": row.category, "price": row.price, "rank": row.rank}
+            for row in rows
+        ]
+    return results
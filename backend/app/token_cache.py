@@ -0,0 +1,49 @@
+"""Bounded LRU of access tokens whose signature has already been verified.
+
+Keyed by a SHA-256 digest of the token so raw bearer tokens are not kept in
+memory as dict keys. An entry is only served until the token's own `exp`, so
+caching never extends a token's life; a miss just means verifying again.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+def token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+class VerifiedTokenCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[Any]:
+        key = token_digest(token)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, token: str, expires_at: float, value: Any):
+        if self.max_entries <= 0:
+            return
+        key = token_digest(token)
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, token: str):
+        self._entries.pop(token_digest(token), None)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,102 @@
+"""Pub/sub backplane connecting the RoomManagers of several workers or hosts.
+
+Each worker subscribes to `room:<join_code>` for the rooms it has local
+clients in, and publishes room broadcasts, targeted messages and presence
+changes there. RedisBackplane works across processes and hosts (requires the
+optional `redis` package); InMemoryBackplane connects RoomManagers living in
+the same process, which is handy for local runs.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Set
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[str, str], Awaitable[None]]
+
+
+def room_channel(join_code: int) -> str:
+    return f"room:{join_code}"
+
+
+class InMemoryHub:
+    """Channel registry shared by the InMemoryBackplanes of one process"""
+
+    def __init__(self):
+        self.channels: Dict[str, Set["InMemoryBackplane"]] = {}
+
+
+class InMemoryBackplane:
+    default_hub = InMemoryHub()
+
+    def __init__(self, hub: InMemoryHub | None = None):
+        self.hub = hub or self.default_hub
+        self._on_message: MessageHandler | None = None
+
+    async def start(self, on_message: MessageHandler):
+        self._on_message = on_message
+
+    async def subscribe(self, channel: str):
+        self.hub.channels.setdefault(channel, set()).add(self)
+
+    async def unsubscribe(self, channel: str):
+        subscribers = self.hub.channels.get(channel)
+        if subscribers is not None:
+            subscribers.discard(self)
+            if not subscribers:
+                del self.hub.channels[channel]
+
+    async def publish(self, channel: str, payload: str):
+        for backplane in list(self.hub.channels.get(channel, ())):
+            await backplane._on_message(channel, payload)
+
+    async def close(self):
+        for channel in list(self.hub.channels):
+            await self.unsubscribe(channel)
+
+
+class RedisBackplane:
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url, decode_responses=True)
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        self._reader: asyncio.Task | None = None
+        self._on_message: MessageHandler | None = None
+
+    async def start(self, on_message: MessageHandler):
+        self._on_message = on_message
+        # A pubsub connection can only be read once it has a subscription
+        await self._pubsub.subscribe("rooms:control")
+        self._reader = asyncio.create_task(self._read())
+
+    async def _read(self):
+        while True:
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+                if message is not None and message["type"] == "message":
+                    await self._on_message(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Backplane receive failed: {e}")
+                await asyncio.sleep(1)
+
+    async def subscribe(self, channel: str):
+        await self._pubsub.subscribe(channel)
+
+    async def unsubscribe(self, channel: str):
+        await self._pubsub.unsubscribe(channel)
+
+    async def publish(self, channel: str, payload: str):
+        await self._redis.publish(channel, payload)
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+        await self._pubsub.aclose()
+        await self._redis.aclose()
@@ -0,0 +1,27 @@
+"""JSON encoding for WebSocket signaling messages.
+
+Uses orjson when it is installed and falls back to the standard library.
+Encoded messages are always `str`, because browsers hand binary frames to
+onmessage as Blobs and the frontend expects text frames.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    def encode_message(message: dict) -> str:
+        return orjson.dumps(message).decode()
+
+    def decode_message(text: str):
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch either
+        return orjson.loads(text)
+else:
+    def encode_message(message: dict) -> str:
+        return json.dumps(message, separators=(",", ":"))
+
+    def decode_message(text: str):
+        return json.loads(text)
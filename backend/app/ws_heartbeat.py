@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from typing import Callable, Dict, Hashable, List
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    __slots__ = ("ping", "reap", "last_pong")
+
+    def __init__(self, ping: Callable[[], None], reap: Callable[[], None], now: float):
+        self.ping = ping
+        self.reap = reap
+        self.last_pong = now
+
+
+class HeartbeatWheel:
+    """Pings every registered connection once per interval from a single task.
+
+    Connections are spread over `slots` buckets of a timing wheel; each tick
+    (interval / slots seconds) handles one bucket, pinging the connections in it
+    and reaping those whose last pong is older than `timeout`. The cost of a
+    tick is the size of one bucket, and there is one timer for the whole worker
+    rather than one sleeping task per socket.
+    """
+
+    def __init__(self, interval: float = 30, timeout: float = 75, slots: int = 30):
+        self.interval = interval
+        self.timeout = timeout
+        self.tick = interval / slots
+        self.slots: List[Dict[Hashable, _Entry]] = [{} for _ in range(slots)]
+        self.slot_of: Dict[Hashable, int] = {}
+        self.cursor = 0
+        self.task: asyncio.Task | None = None
+        self.pings_sent = 0
+        self.reaped = 0
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def add(self, key: Hashable, ping: Callable[[], None], reap: Callable[[], None]):
+        """Register a connection; its first ping goes out on the next tick"""
+        self.remove(key)
+        slot = self.cursor
+        self.slots[slot][key] = _Entry(ping, reap, asyncio.get_running_loop().time())
+        self.slot_of[key] = slot
+
+    def remove(self, key: Hashable):
+        slot = self.slot_of.pop(key, None)
+        if slot is not None:
+            self.slots[slot].pop(key, None)
+
+    def pong(self, key: Hashable):
+        slot = self.slot_of.get(key)
+        if slot is not None:
+            self.slots[slot][key].last_pong = asyncio.get_running_loop().time()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while True:
+            # Sleep to an absolute deadline so ticks do not drift under load
+            deadline += self.tick
+            await asyncio.sleep(max(0, deadline - loop.time()))
+            try:
+                self._advance(loop.time())
+            except Exception as e:
+                logger.error(f"Heartbeat tick failed: {e}")
+
+    def _advance(self, now: float):
+        bucket = self.slots[self.cursor]
+        self.cursor = (self.cursor + 1) % len(self.slots)
+        for key, entry in list(bucket.items()):
+            if now - entry.last_pong > self.timeout:
+                self.remove(key)
+                self.reaped += 1
+                entry.reap()
+            else:
+                entry.ping()
+                self.pings_sent += 1
+
+    def stats(self) -> dict:
+        return {
+            "connections": len(self.slot_of),
+            "pings_sent": self.pings_sent,
+            "reaped": self.reaped,
+        }
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+
+from fastapi import WebSocket, status
+
+logger = logging.getLogger(__name__)
+
+
+class ClientSender:
+    """Bounded outbound queue for one WebSocket, drained by its own writer task.
+
+    Producers never await the socket: send() enqueues already-encoded text and
+    returns at once, so one slow peer cannot hold up a broadcast to the rest
+    of the room. When the queue is full the message is dropped, and with the
+    "disconnect" policy the client is closed as a slow consumer as well.
+    """
+
+    def __init__(self, websocket: WebSocket, client_id: str, max_queue: int, policy: str = "disconnect",
+                 close_timeout: float = 5):
+        self.websocket = websocket
+        self.client_id = client_id
+        self.policy = policy
+        self.close_timeout = close_timeout
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=max_queue)
+        self.closed = False
+        self.dropped = 0
+        self._writer_task: asyncio.Task | None = None
+        self._close_task: asyncio.Task | None = None
+
+    def start(self):
+        self._writer_task = asyncio.create_task(self._writer())
+
+    def send(self, text: str) -> bool:
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.policy == "disconnect":
+                logger.warning(f"Disconnecting slow client {self.client_id}: send queue full")
+                self.closed = True
+                self._close_task = asyncio.create_task(self._close_slow_consumer())
+            return False
+
+    async def _writer(self):
+        try:
+            while True:
+                text = await self.queue.get()
+                await self.websocket.send_text(text)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error sending to client {self.client_id}: {e}")
+            self.closed = True
+
+    async def _close_slow_consumer(self):
+        # The writer is most likely blocked on this socket; stop it before closing
+        await self.stop()
+        try:
+            await asyncio.wait_for(
+                self.websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Client too slow"),
+                timeout=self.close_timeout,
+            )
+        except Exception as e:
+            logger.error(f"Error closing slow client {self.client_id}: {e}")
+
+    async def stop(self):
+        self.closed = True
+        if self._writer_task is not None and self._writer_task is not asyncio.current_task():
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except (asyncio.CancelledError, Exception):
+                pass
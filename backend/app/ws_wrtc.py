@@ -1,16 +1,25 @@
 import asyncio
+import heapq
+import itertools
 import json
 import logging
+import time
 from datetime import datetime, timedelta
 from typing import Dict, Optional, Set
 import re
+import uuid
 
-from fastapi import APIRouter, WebSocket, HTTPException, status, Depends
+from fastapi import APIRouter, WebSocket, HTTPException, status
 from pydantic import BaseModel, Field, field_validator
-from sqlalchemy.orm import Session
+from sqlalchemy import select
 
-from .database import get_db
+from .database import AsyncSessionLocal, setting
 from .models import RoomModel
+from .room_cache import room_credentials
+from .ws_backplane import InMemoryBackplane, RedisBackplane, room_channel
+from .ws_codec import decode_message, encode_message
+from .ws_heartbeat import HeartbeatWheel
+from .ws_sender import ClientSender
 
 router = APIRouter()
 
@@ -26,6 +35,10 @@ WEBRTC_CONFIG = {
     ]
 }
 
+# Constant messages are encoded once at import
+WEBRTC_CONFIG_MESSAGE = encode_message({"type": "webrtc_config", "config": WEBRTC_CONFIG})
+PING_MESSAGE = encode_message({"type": "ping"})
+
 class RoomJoinRequest(BaseModel):
     """Pydantic model for room join requests with validation"""
     join_code: int = Field(..., description="6-digit join code to identify the room")
@@ -47,104 +60,471 @@ class RoomManager:
     def __init__(self):
         self.rooms: Dict[int, Dict] = {}
         self.inactive_room_check_interval = 300  # 5 minutes
+        self.room_idle_timeout = timedelta(minutes=30)
+        # (deadline, seq, join_code, room) per open room, earliest first. Activity does not touch
+        # the heap; an entry that comes due for a room that has been active since is re-pushed.
+        self.expiry_heap: list = []
+        self._expiry_seq = itertools.count()
+        self.reaper_stats = {"runs": 0, "rooms_reaped": 0, "last_run_seconds": 0.0, "total_run_seconds": 0.0}
         # Remove automatic task creation since there's no event loop yet
         self.cleanup_task = None
+        # Identifies this worker on the backplane; client ids are uuids so they are unique across workers
+        self.node_id = uuid.uuid4().hex
+        self.backplane = None
+        # Participants connected to other workers, learned from backplane presence messages,
+        # and the worker each one is connected to
+        self.remote_participants: Dict[int, Dict[str, dict]] = {}
+        self.remote_origins: Dict[int, Dict[str, str]] = {}
+        # When each other worker was last heard from; a worker that dies without publishing
+        # `leave` goes quiet, and its participants are dropped after ws_presence_ttl
+        self.worker_last_seen: Dict[str, float] = {}
+        self.remote_expired = 0
+        self.presence_task: Optional[asyncio.Task] = None
+        # Per event type: how many were handled and how many messages they fanned out to
+        self.event_stats: Dict[str, Dict[str, int]] = {}
+        self.background_tasks: Set[asyncio.Task] = set()
+        # One scheduler pings every local client and reaps those that stop answering
+        self.heartbeat = HeartbeatWheel(
+            interval=setting.ws_heartbeat_interval,
+            timeout=setting.ws_heartbeat_timeout,
+            slots=setting.ws_heartbeat_slots
+        )
+
+    def record_event(self, event: str, sent: int):
+        stats = self.event_stats.setdefault(event, {"events": 0, "messages_sent": 0})
+        stats["events"] += 1
+        stats["messages_sent"] += sent
+
+    def stats(self) -> dict:
+        return {
+            "rooms": len(self.rooms),
+            "local_clients": sum(len(room['clients']) for room in self.rooms.values()),
+            "events": self.event_stats,
+            "remote_clients": sum(len(clients) for clients in self.remote_participants.values()),
+            "remote_expired": self.remote_expired,
+            "heartbeat": self.heartbeat.stats(),
+            "reaper": {**self.reaper_stats, "scheduled": len(self.expiry_heap)},
+        }
+
+    async def start_backplane(self, backplane):
+        self.backplane = backplane
+        await backplane.start(self._on_backplane_message)
+        self.presence_task = asyncio.create_task(self._presence_loop())
+
+    async def stop_backplane(self):
+        if self.presence_task is not None:
+            self.presence_task.cancel()
+            try:
+                await self.presence_task
+            except asyncio.CancelledError:
+                pass
+            self.presence_task = None
+        if self.backplane is not None:
+            await self.backplane.close()
+            self.backplane = None
+
+    async def _publish(self, join_code: int, header: dict, payload: str = ""):
+        """Publish to the other workers in the room: a JSON header line, then the raw payload"""
+        if self.backplane is None:
+            return
+        header.update(origin=self.node_id, join_code=join_code)
+        try:
+            await self.backplane.publish(room_channel(join_code), f"{encode_message(header)}\n{payload}")
+        except Exception as e:
+            logger.error(f"Error publishing to backplane for room {join_code}: {e}")
+
+    async def _on_backplane_message(self, channel: str, data: str):
+        raw_header, _, payload = data.partition("\n")
+        header = decode_message(raw_header)
+        join_code = header["join_code"]
+        origin = header["origin"]
+        if origin == self.node_id:
+            return
+        self.worker_last_seen[origin] = time.monotonic()
+        if join_code not in self.rooms:
+            return
+
+        kind = header["kind"]
+        if kind == "message":
+            if header.get("to"):
+                self._deliver_local(join_code, payload, only=header["to"])
+            else:
+                self._deliver_local(join_code, payload, exclude_client=header.get("exclude"))
+        elif kind == "presence":
+            self.remote_participants.setdefault(join_code, {})[header["client_id"]] = header["participant"]
+            self.remote_origins.setdefault(join_code, {})[header["client_id"]] = origin
+            self._mark_changed(join_code, header["client_id"], header["participant"])
+        elif kind == "leave":
+            self.remote_origins.get(join_code, {}).pop(header["client_id"], None)
+            if self.remote_participants.get(join_code, {}).pop(header["client_id"], None) is not None:
+                self._mark_changed(join_code, header["client_id"], None)
+        elif kind == "sync":
+            # A worker just joined this room; announce our local participants to it
+            room = self.rooms.get(join_code)
+            if room is None:
+                return
+            # Copied, since clients may join or leave while a presence is being published
+            for client_id, client_data in list(room['clients'].items()):
+                await self._publish_presence(join_code, client_id, client_data)
+
+    async def _presence_loop(self):
+        """Tell the rooms this worker is alive, and forget participants of workers that went quiet"""
+        while True:
+            await asyncio.sleep(setting.ws_presence_interval)
+            try:
+                for join_code, room in list(self.rooms.items()):
+                    if room['clients']:
+                        await self._publish(join_code, {"kind": "alive"})
+                self._expire_remote_participants(time.monotonic())
+            except Exception as e:
+                logger.error(f"Error in presence loop: {e}")
+
+    def _expire_remote_participants(self, now: float):
+        stale = {
+            origin for origin, seen in self.worker_last_seen.items()
+            if now - seen > setting.ws_presence_ttl
+        }
+        if not stale:
+            return
+        for join_code, origins in list(self.remote_origins.items()):
+            for client_id, origin in list(origins.items()):
+                if origin in stale:
+                    del origins[client_id]
+                    self.remote_participants.get(join_code, {}).pop(client_id, None)
+                    self.remote_expired += 1
+                    self._mark_changed(join_code, client_id, None)
+        for origin in stale:
+            del self.worker_last_seen[origin]
+        logger.warning(f"Dropped participants of unresponsive workers: {', '.join(sorted(stale))}")
+
+    async def _publish_presence(self, join_code: int, client_id: str, client_data: dict):
+        await self._publish(join_code, {
+            "kind": "presence",
+            "client_id": client_id,
+            "participant": self._participant(client_id, client_data)
+        })
+
+    async def add_client(self, join_code: int, client_id: str, client_data: dict):
+        if join_code not in self.rooms:
+            self.rooms[join_code] = {
+                'clients': {},
+                'last_activity': datetime.utcnow(),
+                # Participant changes since the last delta, keyed by client id (None means left)
+                'version': 0,
+                'changed': {},
+                'flush_handle': None
+            }
+            self._schedule_expiry(join_code, self.rooms[join_code])
+            if self.backplane is not None:
+                await self.backplane.subscribe(room_channel(join_code))
+                await self._publish(join_code, {"kind": "sync"})
+        self.rooms[join_code]['clients'][client_id] = client_data
+        # Started only once registered, so remove_client is always there to stop the writer
+        client_data['sender'].start()
+        self.heartbeat.add(
+            (join_code, client_id),
+            ping=lambda: self.record_event("ping", int(client_data['sender'].send(PING_MESSAGE))),
+            reap=lambda: self._spawn(self._reap_client(join_code, client_id))
+        )
+        self._mark_changed(join_code, client_id, self._participant(client_id, client_data))
+        await self._publish_presence(join_code, client_id, client_data)
+
+    async def remove_client(self, join_code: int, client_id: str) -> Optional[dict]:
+        room = self.rooms.get(join_code)
+        if not room or client_id not in room['clients']:
+            return None
+        client_data = room['clients'].pop(client_id)
+        self.heartbeat.remove((join_code, client_id))
+        await client_data['sender'].stop()
+        await self._publish(join_code, {"kind": "leave", "client_id": client_id})
+        if not room['clients']:
+            await self._drop_room(join_code)
+        else:
+            self._mark_changed(join_code, client_id, None, room=room)
+        return client_data
+
+    async def disconnect_client(self, join_code: int, client_id: str) -> Optional[dict]:
+        """Tell the room a client left and remove it; None if it was already gone"""
+        client_data = self.rooms.get(join_code, {}).get('clients', {}).get(client_id)
+        if not client_data:
+            return None
+        await self.broadcast_message(
+            join_code,
+            {
+                "type": "user_left",
+                "client_id": client_id,
+                "user_id": client_data['user_id'],
+                "username": client_data['username'],
+                "timestamp": datetime.utcnow().isoformat()
+            },
+            exclude_client=client_id
+        )
+        return await self.remove_client(join_code, client_id)
+
+    def _spawn(self, coro):
+        # Keep a reference so fire-and-forget tasks are not garbage collected mid-flight
+        task = asyncio.create_task(coro)
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+
+    async def _reap_client(self, join_code: int, client_id: str):
+        """Drop a client whose pong is overdue; its message loop ends once the socket is closed"""
+        logger.warning(f"Reaping client {client_id} in room {join_code}: heartbeat timed out")
+        client_data = await self.disconnect_client(join_code, client_id)
+        if client_data:
+            try:
+                await asyncio.wait_for(
+                    client_data['websocket'].close(code=status.WS_1001_GOING_AWAY, reason="Heartbeat timeout"),
+                    timeout=5
+                )
+            except Exception as e:
+                logger.error(f"Error closing reaped client {client_id}: {e}")
+
+    async def update_media_state(self, join_code: int, client_id: str, is_video_enabled: bool, is_audio_enabled: bool):
+        client_data = self.rooms[join_code]['clients'][client_id]
+        client_data['media_state'].update({
+            'isVideoEnabled': is_video_enabled,
+            'isAudioEnabled': is_audio_enabled
+        })
+        self._mark_changed(join_code, client_id, self._participant(client_id, client_data))
+        await self._publish_presence(join_code, client_id, client_data)
+
+    def _mark_changed(self, join_code: int, client_id: str, participant: Optional[dict], room: Optional[dict] = None):
+        """Queue a participant change; changes within the debounce window go out as one delta"""
+        if room is None:
+            room = self.rooms.get(join_code)
+            if room is None:
+                # The room was closed meanwhile; there is nobody left to tell
+                return
+        room['changed'][client_id] = participant
+        if room['flush_handle'] is None:
+            room['flush_handle'] = asyncio.get_running_loop().call_later(
+                setting.ws_participants_debounce_ms / 1000, self._flush_participants, join_code
+            )
+
+    def _flush_participants(self, join_code: int):
+        room = self.rooms.get(join_code)
+        if room is None:
+            return
+        changed, room['changed'], room['flush_handle'] = room['changed'], {}, None
+        room['version'] += 1
+        payload = encode_message({
+            "type": "participants_delta",
+            "version": room['version'],
+            "updated": [participant for participant in changed.values() if participant is not None],
+            "removed": [client_id for client_id, participant in changed.items() if participant is None]
+        })
+        self.record_event("participants_delta", self._deliver_local(join_code, payload))
+
+    def participants_snapshot(self, join_code: int) -> dict:
+        """Full participants list at the room's current delta version.
+
+        Pending changes are already reflected in the list and are sent again in the
+        next delta; deltas carry whole participant entries, so applying them twice is
+        harmless.
+        """
+        return {
+            "type": "participants_list",
+            "version": self.rooms[join_code]['version'],
+            "participants": self.get_room_participants(join_code)
+        }
+
+    async def _drop_room(self, join_code: int):
+        room = self.rooms.pop(join_code, None)
+        if room is not None and room['flush_handle'] is not None:
+            room['flush_handle'].cancel()
+        await self._release_room(join_code)
+
+    async def _release_room(self, join_code: int):
+        self.remote_participants.pop(join_code, None)
+        self.remote_origins.pop(join_code, None)
+        if self.backplane is not None:
+            try:
+                await self.backplane.unsubscribe(room_channel(join_code))
+            except Exception as e:
+                logger.error(f"Error unsubscribing from room {join_code}: {e}")
 
     async def start_cleanup_task(self):
-        """Start the cleanup task when an event loop is available"""
+        """Start the cleanup and heartbeat tasks when an event loop is available"""
         if self.cleanup_task is None:
             self.cleanup_task = asyncio.create_task(self._cleanup_inactive_rooms())
+        self.heartbeat.start()
 
-    def verify_room(self, db: Session, join_code: int, password: str) -> Optional[RoomModel]:
-        """Verify room exists and password matches"""
-        room = db.query(RoomModel).filter(
-            RoomModel.join_code == join_code,
-            RoomModel.password == password
-        ).first()
-        return room
+    @staticmethod
+    async def _load_room_password(join_code: int) -> Optional[str]:
+        async with AsyncSessionLocal() as db:
+            return await db.scalar(select(RoomModel.password).where(RoomModel.join_code == join_code))
+
+    async def verify_room(self, join_code: int, password: str) -> bool:
+        """Verify room exists and password matches, without blocking the event loop"""
+        return await room_credentials.verify(join_code, password, self._load_room_password)
+
+    def _schedule_expiry(self, join_code: int, room: dict):
+        deadline = room['last_activity'] + self.room_idle_timeout
+        heapq.heappush(self.expiry_heap, (deadline, next(self._expiry_seq), join_code, room))
 
     async def _cleanup_inactive_rooms(self):
-        """Periodically clean up inactive rooms"""
+        """Close rooms idle for longer than room_idle_timeout, waking up only when one may be due"""
         while True:
-            await asyncio.sleep(self.inactive_room_check_interval)
-            current_time = datetime.utcnow()
-            inactive_rooms = []
-            
-            for join_code, room in self.rooms.items():
-                if (current_time - room['last_activity']) > timedelta(minutes=30):
-                    inactive_rooms.append(join_code)
-            
-            for join_code in inactive_rooms:
-                await self.close_room(join_code)
+            delay = self.inactive_room_check_interval
+            if self.expiry_heap:
+                due_in = (self.expiry_heap[0][0] - datetime.utcnow()).total_seconds()
+                delay = min(max(due_in, 0), delay)
+            await asyncio.sleep(delay)
+            try:
+                await self._reap_expired_rooms()
+            except Exception as e:
+                logger.error(f"Error reaping inactive rooms: {e}")
+
+    async def _reap_expired_rooms(self):
+        started = time.perf_counter()
+        now = datetime.utcnow()
+        expired = []
+        while self.expiry_heap and self.expiry_heap[0][0] <= now:
+            _, _, join_code, room = heapq.heappop(self.expiry_heap)
+            if self.rooms.get(join_code) is not room:
+                continue  # closed, or emptied and recreated, since it was scheduled
+            if room['last_activity'] + self.room_idle_timeout > now:
+                self._schedule_expiry(join_code, room)
+            else:
+                expired.append(join_code)
+
+        await asyncio.gather(*(self.close_room(join_code) for join_code in expired))
+
+        elapsed = time.perf_counter() - started
+        self.reaper_stats["runs"] += 1
+        self.reaper_stats["rooms_reaped"] += len(expired)
+        self.reaper_stats["last_run_seconds"] = elapsed
+        self.reaper_stats["total_run_seconds"] += elapsed
 
     async def close_room(self, join_code: int):
         """Close all connections in a room and clean up"""
-        if join_code in self.rooms:
-            for client_data in self.rooms[join_code]['clients'].values():
-                try:
-                    await client_data['websocket'].close(code=1000, reason="Room closed due to inactivity")
-                except Exception as e:
-                    logger.error(f"Error closing websocket: {e}")
-            del self.rooms[join_code]
-            logger.info(f"Closed inactive room {join_code}")
+        # Taken out of self.rooms before any await, so handlers of the closing sockets find it gone
+        room = self.rooms.pop(join_code, None)
+        if room is None:
+            return
+        if room['flush_handle'] is not None:
+            room['flush_handle'].cancel()
+        clients = list(room['clients'].items())
+        for client_id, _ in clients:
+            self.heartbeat.remove((join_code, client_id))
+
+        await asyncio.gather(*(self._close_client(client_id, client_data) for client_id, client_data in clients))
+
+        for client_id, _ in clients:
+            await self._publish(join_code, {"kind": "leave", "client_id": client_id})
+        if join_code not in self.rooms:  # nobody rejoined while the sockets were closing
+            await self._release_room(join_code)
+        logger.info(f"Closed inactive room {join_code}")
+
+    async def _close_client(self, client_id: str, client_data: dict):
+        try:
+            await client_data['sender'].stop()
+            await asyncio.wait_for(
+                client_data['websocket'].close(code=1000, reason="Room closed due to inactivity"),
+                timeout=5
+            )
+        except Exception as e:
+            logger.error(f"Error closing websocket for client {client_id}: {e}")
 
     async def broadcast_message(self, join_code: int, message: dict, exclude_client: str = None):
         """Broadcast message to all clients in room except sender"""
+        await self.broadcast_encoded(join_code, encode_message(message), exclude_client, event=message["type"])
+
+    async def broadcast_encoded(self, join_code: int, payload: str, exclude_client: str = None, event: str = "other"):
+        """Broadcast already-encoded text; the same string is queued for every recipient"""
         if join_code in self.rooms:
-            for client_id, client_data in self.rooms[join_code]['clients'].items():
-                if client_id != exclude_client:
-                    try:
-                        await client_data['websocket'].send_json(message)
-                    except Exception as e:
-                        logger.error(f"Error broadcasting to client {client_id}: {e}")
+            sent = self._deliver_local(join_code, payload, exclude_client=exclude_client)
+            remote = self.remote_participants.get(join_code, {})
+            await self._publish(join_code, {"kind": "message", "exclude": exclude_client}, payload)
+            self.record_event(event, sent + len(remote) - (exclude_client in remote))
+
+    def _deliver_local(self, join_code: int, payload: str, exclude_client: str = None, only: str = None) -> int:
+        """Queue payload for local clients and return how many it was queued for"""
+        clients = self.rooms[join_code]['clients']
+        if only is not None:
+            if only in clients:
+                clients[only]['sender'].send(payload)
+                return 1
+            return 0
+        sent = 0
+        for client_id, client_data in clients.items():
+            if client_id != exclude_client:
+                client_data['sender'].send(payload)
+                sent += 1
+        return sent
+
+    async def send_to_client(self, join_code: int, client_id: str, message: dict) -> bool:
+        """Queue a message for a single client; False if it is not in the room"""
+        return await self.send_encoded_to_client(join_code, client_id, encode_message(message), event=message["type"])
+
+    async def send_encoded_to_client(self, join_code: int, client_id: str, payload: str, event: str = "other") -> bool:
+        """Queue already-encoded text for one client, looked up by id in the room's client dict"""
+        client_data = self.rooms.get(join_code, {}).get('clients', {}).get(client_id)
+        if client_data:
+            client_data['sender'].send(payload)
+        elif client_id in self.remote_participants.get(join_code, {}):
+            await self._publish(join_code, {"kind": "message", "to": client_id}, payload)
+        else:
+            self.record_event(event, 0)
+            return False
+        self.record_event(event, 1)
+        return True
+
+    @staticmethod
+    def _participant(client_id: str, client_data: dict) -> dict:
+        return {
+            'client_id': client_id,
+            'user_id': client_data['user_id'],
+            'username': client_data['username'],
+            'isVideoEnabled': client_data['media_state']['isVideoEnabled'],
+            'isAudioEnabled': client_data['media_state']['isAudioEnabled']
+        }
 
     def get_room_participants(self, join_code: int) -> list:
-        """Get list of participants with their media states"""
+        """Get list of participants with their media states, across all workers"""
         if join_code not in self.rooms:
             return []
         
-        participants = []
-        for client_id, client_data in self.rooms[join_code]['clients'].items():
-            participants.append({
-                'client_id': client_id,
-                'user_id': client_data['user_id'],
-                'username': client_data['username'],
-                'isVideoEnabled': client_data['media_state']['isVideoEnabled'],
-                'isAudioEnabled': client_data['media_state']['isAudioEnabled']
-            })
+        participants = [
+            self._participant(client_id, client_data)
+            for client_id, client_data in self.rooms[join_code]['clients'].items()
+        ]
+        participants.extend(self.remote_participants.get(join_code, {}).values())
         return participants
 
 # Initialize room manager
 room_manager = RoomManager()
 
+
+async def startup():
+    if setting.ws_backplane == "redis":
+        await room_manager.start_backplane(RedisBackplane(setting.ws_backplane_redis_url))
+    elif setting.ws_backplane == "memory":
+        await room_manager.start_backplane(InMemoryBackplane())
+
+
+async def shutdown():
+    await room_manager.heartbeat.stop()
+    await room_manager.stop_backplane()
+
+
 @router.websocket("/ws/{join_code}/{password}")
 async def websocket_endpoint(
     websocket: WebSocket, 
     join_code: int, 
-    password: str,
-    db: Session = Depends(get_db)
+    password: str
 ):
     # Start cleanup task when first websocket connects
     await room_manager.start_cleanup_task()
     
     client_id = None
-    ping_task = None
-    
-    async def send_ping():
-        while True:
-            try:
-                await websocket.send_json({"type": "ping"})
-                await asyncio.sleep(30)
-            except Exception as e:
-                logger.error(f"Error sending ping: {e}")
-                break
 
     try:
         logger.info(f"Attempting WebSocket connection for room {join_code}")
         
         # Verify room exists and password matches
-        room = room_manager.verify_room(db, join_code, password)
-        if not room:
+        if not await room_manager.verify_room(join_code, password):
             logger.warning(f"Invalid room or password for join_code {join_code}")
             await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
             return
@@ -152,15 +532,6 @@ async def websocket_endpoint(
         await websocket.accept()
         logger.info(f"WebSocket connection accepted for room {join_code}")
             
-        # Initialize room if needed
-        if join_code not in room_manager.rooms:
-            room_manager.rooms[join_code] = {
-                'clients': {},
-                'last_activity': datetime.utcnow()
-            }
-            
-        client_id = str(id(websocket))
-        
         try:
             # Get user info from initial connection
             initial_data = await websocket.receive_json()
@@ -174,29 +545,32 @@ async def websocket_endpoint(
             await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA)
             return
         
+        client_id = uuid.uuid4().hex
+
+        # All writes to the socket go through the sender's queue; add_client starts it
+        sender = ClientSender(
+            websocket, client_id,
+            max_queue=setting.ws_send_queue_size,
+            policy=setting.ws_slow_consumer_policy
+        )
+
         # Store client data with media state
-        room_manager.rooms[join_code]['clients'][client_id] = {
+        await room_manager.add_client(join_code, client_id, {
             'websocket': websocket,
+            'sender': sender,
             'user_id': user_id,
             'username': username,
             'media_state': {
                 'isVideoEnabled': False,
                 'isAudioEnabled': False
-            },
-            'last_ping': datetime.utcnow()
-        }
+            }
+        })
         
         # Send WebRTC configuration
-        await websocket.send_json({
-            "type": "webrtc_config",
-            "config": WEBRTC_CONFIG
-        })
+        await room_manager.send_encoded_to_client(join_code, client_id, WEBRTC_CONFIG_MESSAGE, event="webrtc_config")
         
         # Send current participants list
-        await websocket.send_json({
-            "type": "participants_list",
-            "participants": room_manager.get_room_participants(join_code)
-        })
+        await room_manager.send_to_client(join_code, client_id, room_manager.participants_snapshot(join_code))
         
         # Notify others about new connection
         await room_manager.broadcast_message(
@@ -211,14 +585,11 @@ async def websocket_endpoint(
             exclude_client=client_id
         )
         
-        # Start ping/pong
-        ping_task = asyncio.create_task(send_ping())
-        
         # Main message handling loop
         while True:
             try:
                 data = await websocket.receive_text()
-                message = json.loads(data)
+                message = decode_message(data)
                 room_manager.rooms[join_code]['last_activity'] = datetime.utcnow()
                 
                 message_type = message.get("type")
@@ -227,32 +598,29 @@ async def websocket_endpoint(
                     continue
 
                 if message_type == "pong":
-                    room_manager.rooms[join_code]['clients'][client_id]['last_ping'] = datetime.utcnow()
+                    room_manager.heartbeat.pong((join_code, client_id))
                 
                 elif message_type == "offer":
                     if "to_client" not in message:
                         logger.warning(f"Received offer without to_client from user {username}")
                         continue
-                    await room_manager.broadcast_message(join_code, message, exclude_client=client_id)
+                    # Only the addressed peer can use an offer, so it is routed like answers
+                    if not await room_manager.send_encoded_to_client(join_code, message["to_client"], data, event="offer"):
+                        logger.warning(f"Target client {message['to_client']} not found for offer")
                 
                 elif message_type == "answer":
                     if "to_client" not in message:
                         logger.warning(f"Received answer without to_client from user {username}")
                         continue
-                    target_client = room_manager.rooms[join_code]['clients'].get(message["to_client"])
-                    if target_client:
-                        await target_client['websocket'].send_json(message)
-                    else:
+                    # Relayed as received, without re-encoding
+                    if not await room_manager.send_encoded_to_client(join_code, message["to_client"], data, event="answer"):
                         logger.warning(f"Target client {message['to_client']} not found for answer")
                 
                 elif message_type == "ice_candidate":
                     if "to_client" not in message:
                         logger.warning(f"Received ICE candidate without to_client from user {username}")
                         continue
-                    target_client = room_manager.rooms[join_code]['clients'].get(message["to_client"])
-                    if target_client:
-                        await target_client['websocket'].send_json(message)
-                    else:
+                    if not await room_manager.send_encoded_to_client(join_code, message["to_client"], data, event="ice_candidate"):
                         logger.warning(f"Target client {message['to_client']} not found for ICE candidate")
                 
                 elif message_type == "chat":
@@ -275,20 +643,11 @@ async def websocket_endpoint(
                         logger.warning(f"Received incomplete media state update from user {username}")
                         continue
                         
-                    room_manager.rooms[join_code]['clients'][client_id]['media_state'].update({
-                        'isVideoEnabled': message['isVideoEnabled'],
-                        'isAudioEnabled': message['isAudioEnabled']
-                    })
+                    # Folded into the room's next participants_delta
+                    await room_manager.update_media_state(
+                        join_code, client_id, message['isVideoEnabled'], message['isAudioEnabled']
+                    )
 
-                    participants = room_manager.get_room_participants(join_code)
-                    await room_manager.broadcast_message(
-                        join_code,
-                        {
-                            "type": "participants_list",
-                            "participants": participants
-                        }
-                    )   
-    
                     await room_manager.broadcast_message(
                         join_code,
                         {
@@ -299,6 +658,11 @@ async def websocket_endpoint(
                         },
                         exclude_client=client_id
                     )
+
+                elif message_type == "resync":
+                    # Client missed a participants_delta version; send the full list again
+                    await room_manager.send_to_client(join_code, client_id, room_manager.participants_snapshot(join_code))
+
                 else:
                     logger.warning(f"Received unknown message type: {message_type} from user {username}")
                 
@@ -314,29 +678,9 @@ async def websocket_endpoint(
         
     finally:
         try:
-            if ping_task:
-                ping_task.cancel()
-                
-            if client_id and join_code in room_manager.rooms:
-                client_data = room_manager.rooms[join_code]['clients'].get(client_id)
-                if client_data:
-                    # Notify about disconnection
-                    await room_manager.broadcast_message(
-                        join_code,
-                        {
-                            "type": "user_left",
-                            "client_id": client_id,
-                            "user_id": client_data['user_id'],
-                            "username": client_data['username'],
-                            "timestamp": datetime.utcnow().isoformat()
-                        },
-                        exclude_client=client_id
-                    )
-                    
-                    # Cleanup
-                    del room_manager.rooms[join_code]['clients'][client_id]
-                    if not room_manager.rooms[join_code]['clients']:
-                        del room_manager.rooms[join_code]
+            if client_id:
+                # Notify about disconnection and clean up, unless the heartbeat already reaped it
+                await room_manager.disconnect_client(join_code, client_id)
                         
             logger.info(f"WebSocket connection closed for room {join_code}")
         except Exception as e: